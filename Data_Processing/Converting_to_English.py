@@ -2,69 +2,57 @@ import pandas as pd
 import os
 import re
 import sys
-from persiantools.jdatetime import JalaliDate
-import wikipediaapi
 from urllib.parse import unquote
 import re
 from googletrans import Translator
 import time
 from difflib import SequenceMatcher
-import ast
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Construct the full path to the CSV file
-Events_df=pd.read_csv(script_dir+"/final_events_df.csv")
+# Shared Wikipedia API helpers (pooled engine, WIKI_BASE_URL / WIKI_RECORD_DIR switches)
+sys.path.append(os.path.join(script_dir, '..', 'Wikipedia_data_collector'))
+from wiki_api import fetch_langlinks, fetch_page_title, title_from_url
+from rate_limiter import get_limiter, TRANSLATE_HOST
+from translation_client import PackedTranslator
+from frame_store import read_frame, write_frame, EVENT_COLUMNS, DEATH_COLUMNS
+from jalali_dates import add_gregorian_columns
+from translation_memory import get_translation_memory, GOOGLE
 
-Deaths_df=pd.read_csv(script_dir+"/final_deaths_df.csv")
+limiter = get_limiter()
+# Persistent translations shared with 04_translate_titles.py: repeated and already translated texts cost no request
+memory = get_translation_memory()
+
+# Construct the full path to the Parquet file (see frame_store.py)
+Events_df=read_frame(script_dir+"/final_events_df.parquet", EVENT_COLUMNS)
+
+Deaths_df=read_frame(script_dir+"/final_deaths_df.parquet", DEATH_COLUMNS)
 
 #check how many nan value in month column
 print("Number of NaN values in Events month column:", Events_df['month'].isna().sum())
 print("Number of NaN values in Deaths month column:", Deaths_df['month'].isna().sum())
-#convert the date columns from jalali to gregorian
-def convert_jalali_to_gregorian(year, month, day):
-    try:
-        # Ensure year, month, day are integers
-        year = int(year)
-        if year <0:
-            year= 1
-        month = int(month)
-        day = int(day)
-        if day==0:
-            day=1
-        # Convert Jalali date to Gregorian date
-        gregorian_date = JalaliDate(year, month, day).to_gregorian()
-        return gregorian_date.strftime('%Y-%m-%d')
-    except Exception as e:
-        print(f"Error converting date {year}-{month}-{day}: {e}")
-        return None
-
+#convert the date columns from jalali to gregorian, whole columns at once (see jalali_dates.py)
 # Apply the conversion to the Events_df dataframe and create new columns day_gregorian month_gregorian year_gregorian
-Events_df[['year_gregorian', 'month_gregorian', 'day_gregorian']] = Events_df.apply(
-    lambda row: pd.Series(convert_jalali_to_gregorian(row['year'], row['month'], row['day']).split('-')), axis=1)
-print("Events_df conversion done")
+valid_dates = add_gregorian_columns(Events_df)
+print(f"Events_df conversion done, {(~valid_dates).sum()} invalid dates left empty")
 
 
 # Apply the conversion to the Deaths_df dataframe and create new columns day_gregorian month_gregorian year_gregorian
-Deaths_df[['year_gregorian', 'month_gregorian', 'day_gregorian']] = Deaths_df.apply(
-    lambda row: pd.Series(convert_jalali_to_gregorian(row['year'], row['month'], row['day']).split('-')), axis=1)
-
-print("Deaths_df conversion done")
-# Save the updated dataframes back to CSV files
-#Events_df.to_csv(script_dir+"/final_events_df_gregorian.csv", index=False)
+valid_dates = add_gregorian_columns(Deaths_df)
+print(f"Deaths_df conversion done, {(~valid_dates).sum()} invalid dates left empty")
+# Save the updated dataframes back to Parquet files
+#write_frame(Events_df, script_dir+"/final_events_df_gregorian.parquet", EVENT_COLUMNS)
 
-#Deaths_df.to_csv(script_dir+"/final_deaths_df_gregorian.csv", index=False)
+#write_frame(Deaths_df, script_dir+"/final_deaths_df_gregorian.parquet", DEATH_COLUMNS)
 
 #
 #get the langlinks of a wikipedia page from its url and if the english link exists return it
 
 def get_langlinks_from_url(url):
-    wiki_wiki = wikipediaapi.Wikipedia(user_agent='Iranian Timeline asghariali9877@gmail.com', language='fa')
-    page = wiki_wiki.page(url.split('/wiki/')[-1])
-    if page.exists():
-        langs = page.langlinks
+    langs = fetch_langlinks('fa', title_from_url(url))
+    if langs is not None:
         if langs.get('en'):
-            return langs.get('en').fullurl
+            return langs.get('en')
         else:
             return "<No English page found>"
 
@@ -96,30 +84,47 @@ from tqdm import tqdm
 #Deaths_df['person_link_english'] = Deaths_df['person_link'].progress_apply(lambda x: get_langlinks_from_url(convert_wiki_url_to_persian(x)) if pd.notna(x) else x)
 
 #save the updated dataframe back to csv file
-#Deaths_df.to_csv(script_dir+"/final_deaths_df_gregorian_with_english_links.csv", index=False)
+#write_frame(Deaths_df, script_dir+"/final_deaths_df_gregorian_with_english_links.parquet", DEATH_COLUMNS)
 
-#load the updated dataframe back from csv file
-Deaths_df=pd.read_csv(script_dir+"/final_deaths_English.csv")
+#load the updated dataframe back from the parquet file
+Deaths_df=read_frame(script_dir+"/final_deaths_English.parquet", DEATH_COLUMNS)
 
 #Translate the names to english 
 #For those who have English wikipedia page link use that to get the name
 def get_english_name_from_wiki_url(url):
-    wiki_wiki = wikipediaapi.Wikipedia(user_agent='Iranian Timeline asghariali9877@gmail.com', language='en')
-    page = wiki_wiki.page(url.split('/wiki/')[-1])
-    if page.exists():
-        print(f"Found English page: {page.title}")
-        return page.title
+    title = fetch_page_title('en', title_from_url(url))
+    if title is not None:
+        print(f"Found English page: {title}")
+        return title
     else:
         return "<No English name found>"
 
 #A function to translate names using googletrans library
 
 translator = Translator()
+def google_translate(text):
+    # Raises on failure so errors never end up in the translation memory
+    limiter.wait(TRANSLATE_HOST)
+    try:
+        translation = translator.translate(text, src='fa', dest='en')
+    except Exception:
+        limiter.throttle(TRANSLATE_HOST)
+        raise
+    limiter.success(TRANSLATE_HOST)
+    return translation.text
+
+# Packed requests for whole columns, with one googletrans Translator per worker thread
+def make_google_translate():
+    worker_translator = Translator()
+    return lambda text: worker_translator.translate(text, src='fa', dest='en').text
+
+packed_translator = PackedTranslator(make_google_translate)
+
 def translate_name_to_english(name):
     try:
-        translation = translator.translate(name, src='fa', dest='en')
-        print(f"Translated using Google Translator: {translation.text}")
-        return translation.text
+        translation = memory.translate(name, google_translate, 'fa', 'en', GOOGLE)
+        print(f"Translated using Google Translator: {translation}")
+        return translation
     except Exception as e:
         print(f"Error translating name {name}: {e}")
         return "<Translation Error>"
@@ -135,22 +140,20 @@ def translate_name_to_english(name):
 
 
 #save the updated dataframe back to csv file
-#Deaths_df.to_csv(script_dir+"/final_deaths_df_English_names.csv", index=False)
+#write_frame(Deaths_df, script_dir+"/final_deaths_df_English_names.parquet", DEATH_COLUMNS)
 
 
 
 
 
-#load the updated dataframe back from csv file
-Deaths_df=pd.read_csv(script_dir+"/final_deaths_df_English_names.csv")
+#load the updated dataframe back from the parquet file
+Deaths_df=read_frame(script_dir+"/final_deaths_df_English_names.parquet", DEATH_COLUMNS)
 
 
 #Create a function to translate person details to english using googletrans library
 def translate_details_to_english(details):
     try:
-        time.sleep(0.5)  # Add small delay to avoid rate limiting
-        translation = translator.translate(details, src='fa', dest='en')
-        return translation.text
+        return memory.translate(details, google_translate, 'fa', 'en', GOOGLE)
     except Exception as e:
         print(f"Error translating: {e}")
         return "<Translation Error>"
@@ -159,12 +162,13 @@ from tqdm import tqdm
 tqdm.pandas()  # Initialize tqdm with pandas
 #trasnlate person details to english
 # Replace the last line with this:
+#memory.translate_all(Deaths_df['details'].tolist(), packed_translator, 'fa', 'en', GOOGLE)
 #Deaths_df['details_english'] = Deaths_df['details'].progress_apply(
     #lambda x: translate_details_to_english(x) if pd.notna(x) else x)
 
 
 #save the updated dataframe back to csv file
-#Deaths_df.to_csv(script_dir+"/final_deaths_df_English.csv", index=False)
+#write_frame(Deaths_df, script_dir+"/final_deaths_df_English.parquet", DEATH_COLUMNS)
 
 print("All done!")
 
@@ -214,7 +218,7 @@ for i in range(len(Events_df)):
     print(f"Processing row {i+1} of {len(Events_df)}")
     title = Events_df.loc[i, 'title']
     try:
-        link_data = ast.literal_eval(Events_df.loc[i, 'links'])
+        link_data = Events_df.loc[i, 'links']
         matching_url = find_best_matching_link(title, link_data)
         
         if matching_url:
@@ -232,9 +236,7 @@ for i in range(len(Events_df)):
 #treanslate the event titles to english with those with na in the event link column
 def translate_event_title_to_english(title):
     try:
-        time.sleep(0.5)  # Add small delay to avoid rate limiting
-        translation = translator.translate(title, src='fa', dest='en')
-        return translation.text
+        return memory.translate(title, google_translate, 'fa', 'en', GOOGLE)
     except Exception as e:
         print(f"Error translating event title {title}: {e}")
         return "<Translation Error>"
@@ -244,7 +246,11 @@ tqdm.pandas()  # Initialize tqdm with pandas
 Events_df['event_link_english'] = Events_df['event_link'].progress_apply(lambda x: get_langlinks_from_url(convert_wiki_url_to_persian(x)) if pd.notna(x) else x)
 
 #translate event titles to english
+# Titles of events without an English page go to the translation memory in packed requests first,
+# so the row by row step below finds them there
+no_english_page = Events_df['event_link_english'].isna() | (Events_df['event_link_english'] == "<No English page found>")
+memory.translate_all(Events_df.loc[no_english_page, 'title'].tolist(), packed_translator, 'fa', 'en', GOOGLE)
 Events_df['title_english'] = Events_df.apply(lambda row: get_english_name_from_wiki_url(row['event_link_english']) if pd.notna(row['event_link_english']) and row['event_link_english']!="<No English page found>" else translate_event_title_to_english(row['title']), axis=1)
 
-#save the updated dataframe back to csv file
-Events_df.to_csv(script_dir+"/final_events_English2.csv", index=False)
\ No newline at end of file
+#save the updated dataframe back to the parquet file
+write_frame(Events_df, script_dir+"/final_events_English2.parquet", EVENT_COLUMNS)
\ No newline at end of file
@@ -9,14 +9,18 @@ import re
 from googletrans import Translator
 import time
 from difflib import SequenceMatcher
-import ast
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Construct the full path to the CSV file
-Events_df=pd.read_csv(script_dir+"/data/final_events_English.csv")
+# Typed Parquet files between the stages and the keyword classifier
+sys.path.append(os.path.join(script_dir, '..', 'Wikipedia_data_collector'))
+from frame_store import read_frame, write_frame, EVENT_COLUMNS, DEATH_COLUMNS
+from keyword_classifier import compile_labels, classify
 
-Deaths_df=pd.read_csv(script_dir+"/data/final_deaths_English.csv")
+# Construct the full path to the Parquet file (see frame_store.py)
+Events_df=read_frame(script_dir+"/data/final_events_English.parquet", EVENT_COLUMNS)
+
+Deaths_df=read_frame(script_dir+"/data/final_deaths_English.parquet", DEATH_COLUMNS)
 
 
 #using BART to classify the categories of events
@@ -34,34 +38,20 @@ Art_keywords = ['فیلم', 'موسیقی', 'نقاشی', 'ادبیات', 'تئ
 Science_keywords = ['اختراع', 'کشف', 'فضا', 'تلسکوپ', 'زیست‌شناسی', 'فناوری', 'رباتیک', 'هوش مصنوعی', 'پزشکی', 'دارو', 'آزمایشگاه', 'دانشمند']
 Sports_keywords = ['المپیک', 'جام جهانی', 'فوتبال', 'بسکتبال', 'والیبال', 'تنیس', 'دوومیدانی', 'کشتی', 'بوکس', 'ورزشکار', 'مسابقه', 'قهرمانی']  
 
-# Function to check for keywords in details
-def check_keywords(details, keywords):
-    for keyword in keywords:
-        if re.search(r'\b' + re.escape(keyword) + r'\b', details):
-            return True
-    return False   
-
-#check keywords in title column and if found set the corresponding label to 1
-for i in range(len(Events_df)): 
-    print(f"Processing row {i+1} of {len(Events_df)}")
-    details = Events_df.loc[i, 'title']
-    if pd.isna(details):
-        continue
-    # Convert details to lowercase for case-insensitive matching
-    details_lower = details.lower()
-    
-    if check_keywords(details_lower, Politics_keywords):
-        Events_df.loc[i, 'Politics'] = 1.0
-    if check_keywords(details_lower, Social_keywords):
-        Events_df.loc[i, 'Social'] = 1.0
-    if check_keywords(details_lower, Natural_Disaster_keywords):
-        Events_df.loc[i, 'Natural Disaster'] = 1.0
-    if check_keywords(details_lower, Art_keywords):
-        Events_df.loc[i, 'Art'] = 1.0
-    if check_keywords(details_lower, Science_keywords):
-        Events_df.loc[i, 'Science'] = 1.0
-    if check_keywords(details_lower, Sports_keywords):
-        Events_df.loc[i, 'Sports'] = 1.0
+# Keywords of every label compiled once into one Persian-aware pattern (see keyword_classifier.py)
+label_patterns = compile_labels({
+    'Politics': Politics_keywords,
+    'Social': Social_keywords,
+    'Natural Disaster': Natural_Disaster_keywords,
+    'Art': Art_keywords,
+    'Science': Science_keywords,
+    'Sports': Sports_keywords,
+})
+
+#check keywords in title column and if found set the corresponding label to 1, whole column at once
+label_matrix = classify(Events_df['title'], label_patterns)
+for label in label_patterns:
+    Events_df.loc[label_matrix[label], label] = 1.0
 
 
 #check how many rows have at least one label assigned
@@ -76,8 +66,8 @@ print(f"Total number of rows: {len(Events_df)}")
 print(f"Percentage of labeled rows: {len(labeled_rows)/len(Events_df)*100:.2f}%")
 
 
-#save the updated dataframe back to csv file
-Events_df.to_csv(script_dir+"/data/final_events_English_categorized_keywords.csv", index=False)
+#save the updated dataframe back to the parquet file
+write_frame(Events_df, script_dir+"/data/final_events_English_categorized_keywords.parquet", EVENT_COLUMNS)
 
 
 
@@ -2,12 +2,17 @@
 import os
 import pandas as pd
 import json
+import sys
 from collections import defaultdict
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
+# Typed Parquet files between the stages
+sys.path.append(os.path.join(script_dir, '..', 'Wikipedia_data_collector'))
+from frame_store import read_frame, MERGED_COLUMNS
+
 # load the data
-data = pd.read_csv(script_dir + "/data/merged_df.csv")
+data = read_frame(script_dir + "/data/merged_df.parquet", MERGED_COLUMNS)
 print("Data loaded successfully. Shape:", data.shape)
 print(data.head())
 
@@ -1,13 +1,18 @@
 import pandas as pd
 import os
-import requests
+import sys
 #import csv files
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Construct the full path to the CSV file
-Events_df=pd.read_csv(script_dir+"/data/final_events_English_categorized_keywords.csv")
+# Shared Wikipedia API helpers and the typed Parquet files between the stages
+sys.path.append(os.path.join(script_dir, '..', 'Wikipedia_data_collector'))
+from wiki_api import fetch_thumbnails
+from frame_store import read_frame, write_frame, EVENT_COLUMNS, DEATH_COLUMNS, MERGED_COLUMNS
 
-Deaths_df=pd.read_csv(script_dir+"/data/final_deaths_English.csv")
+# Construct the full path to the Parquet file (see frame_store.py)
+Events_df=read_frame(script_dir+"/data/final_events_English_categorized_keywords.parquet", EVENT_COLUMNS)
+
+Deaths_df=read_frame(script_dir+"/data/final_deaths_English.parquet", DEATH_COLUMNS)
 
 #merge the two dataframes and add a new column called type and set its value to event for Events_df and death for Deaths_df
 Events_df['type'] = 'event'
@@ -104,12 +109,12 @@ merged_df.loc[merged_df['type'] == 'death', 'title_english'] = merged_df.loc[mer
 merged_df = merged_df.drop(columns=['person_name_english'])
 
 
-# Save the merged dataframe to a new CSV file
-merged_df.to_csv(script_dir+"/data/merged_df.csv", index=False)
+# Save the merged dataframe to a new Parquet file
+write_frame(merged_df, script_dir+"/data/merged_df.parquet", MERGED_COLUMNS)
 print(f"Merged dataframe has {len(merged_df)} rows.")
 
-#replace all nan values with empty string
-merged_df = merged_df.fillna('')   
+#replace all nan values with empty string (typed and categorical columns can not hold '')
+merged_df = merged_df.astype(object).fillna('')   
 
 #drop all observation with year_gregorian less than 600
 merged_df = merged_df[merged_df['year_gregorian'] >= 600]
@@ -118,68 +123,40 @@ merged_df = merged_df[merged_df['year_gregorian'] >= 600]
 merged_df = merged_df[merged_df['year_gregorian'] <= 2025]
 
 #add a single observation with year_gregorian 2026, month_gregorian 1, day_gregorian 1, date_gregorian January 01, 2026, year 1405, month 1, day 1, date  فروردین 01, 1405, era_persian جمهوری اسلامی, era_english Islamic Republic, type event, title New Era Event, title_english New Era Event, details This is a placeholder event for the new era., details_english This is a placeholder event for the new era., link '', link_english '', keywords '', keywords_english ''
-year	2026
-month	"1"
-day	"1"
-title	"ناشناس"
-links	""
-year_gregorian	2026
-month_gregorian	"01"
-day_gregorian	"01"
-link	""
-link_english	""
-title_english	"Unknown"
-Politics	""
-Social	""
-Natural Disaster	""
-Science	""
-Art	""
-Sports	""
-type	"event"
-details	""
-details_english	"UNKNOWN"
-era_persian	"نیاز به نامگذاری"
-era_english	"New Folder"
-date_gregorian	"2026-01-01"
-date	"فروردین 01, 1405"
-image	""
-
-#a function to get a url of a wikipedia tumbnail image from a wikipedia page link
-def get_wikipedia_thumbnail(url):
-    if url == '':
-        return ''
-    try:
-        if 'fa.wikipedia.org' in url:
-            title = url.split('/wiki/')[1]
-            api_url = f'https://fa.wikipedia.org/w/api.php?action=query&titles={title}&prop=pageimages&format=json&pithumbsize=500'
-        elif 'en.wikipedia.org' in url:
-            title = url.split('/wiki/')[1]
-            api_url = f'https://en.wikipedia.org/w/api.php?action=query&titles={title}&prop=pageimages&format=json&pithumbsize=500'
-        else:
-            return ''
-        
-        # Add a User-Agent header to the request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(api_url, headers=headers)
-        response.raise_for_status()  # Raise an HTTPError for bad responses (4xx and 5xx)
-        
-        data = response.json()
-        pages = data['query']['pages']
-        for page_id in pages:
-            page = pages[page_id]
-            if 'thumbnail' in page:
-                return page['thumbnail']['source']
-        return ''
-    except Exception as e:
-        print(f"Error fetching thumbnail for URL {url}: {e}")
-        return ''
-    
-#apply the function to link column and create a new column called image with a progress bar
-from tqdm import tqdm  
-tqdm.pandas()
-merged_df['image'] = merged_df['link'].progress_apply(get_wikipedia_thumbnail)
+placeholder = pd.DataFrame([{
+    'year': 1405,
+    'month': '1',
+    'day': '1',
+    'title': 'ناشناس',
+    'links': '',
+    'year_gregorian': 2026,
+    'month_gregorian': '01',
+    'day_gregorian': '01',
+    'link': '',
+    'link_english': '',
+    'title_english': 'Unknown',
+    'Politics': '',
+    'Social': '',
+    'Natural Disaster': '',
+    'Science': '',
+    'Art': '',
+    'Sports': '',
+    'type': 'event',
+    'details': '',
+    'details_english': 'UNKNOWN',
+    'era_persian': 'نیاز به نامگذاری',
+    'era_english': 'New Folder',
+    'date_gregorian': '2026-01-01',
+    'date': 'فروردین 01, 1405',
+    'image': '',
+}])
+merged_df = pd.concat([merged_df, placeholder], ignore_index=True)
+
+#get the wikipedia thumbnail image of every link, 50 titles per API request (see wiki_api.fetch_thumbnails)
+#repeated links are only looked up once and redirects are followed
+thumbnails = fetch_thumbnails(merged_df['link'].tolist(), size=500)
+merged_df['image'] = merged_df['link'].map(thumbnails).fillna('')
+print(f"Found thumbnails for {len(thumbnails)} distinct links.")
 
 
 
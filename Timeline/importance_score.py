@@ -1,10 +1,8 @@
 import pandas as pd
 import os
+import sys
 import json
 import numpy as np
-import requests
-from bs4 import BeautifulSoup
-import time
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -23,43 +21,23 @@ combined_df = combined_df.sort_values(by=['year', 'month', 'day'])
 # Replace NaN with empty string for all columns
 combined_df = combined_df.replace({np.nan: ""})
 
-import requests
-from bs4 import BeautifulSoup
-import time
-
-
-def count_words_in_wiki_page(url):
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            for script in soup(['script', 'style']):
-                script.decompose()
-            
-            # Get text and split into words
-            text = soup.get_text(separator=' ')
-            # Count words
-            words = len(text.split())
-            return words
-        return 0
-    except Exception as e:
-        print(f"Error processing {url}: {e}")
-        return 0
-
-# Initialize word_counts column
-combined_df['word_counts'] = 0
-
-# Process each URL with a delay to be respectful to Wikipedia servers
-for idx, row in combined_df.iterrows():
-    if row['link']:
-        print(f"Processing {idx+1}/{len(combined_df)}: {row['link']}")
-        combined_df.at[idx, 'word_counts'] = count_words_in_wiki_page(row['link'])
-        time.sleep(1)  # Add 1 second delay between requests
-
-# Save the updated DataFrame with word counts
+# Shared Wikipedia API helpers
+sys.path.append(os.path.join(script_dir, '..', 'Wikipedia_data_collector'))
+from wiki_api import fetch_page_signals
+
+# Page length, interlanguage link count and recent pageviews of every linked article,
+# read from the API 50 titles per request instead of downloading each article
+linked_urls = combined_df.loc[combined_df['link'] != '', 'link'].unique()
+print(f"Fetching importance signals for {len(linked_urls)} pages")
+signals = fetch_page_signals(linked_urls)
+# Links without signals (their request failed, or they are not Wikipedia articles) are left
+# empty rather than ranked as pages of length 0
+unfetched = [url for url in linked_urls if url not in signals]
+if unfetched:
+    print(f"No importance signals for {len(unfetched)} linked pages, left empty")
+for column in ['page_length', 'langlink_count', 'pageviews']:
+    combined_df[column] = combined_df['link'].map(lambda link: signals.get(link, {}).get(column, np.nan))
+
+# Save the updated DataFrame with the importance signals
 combined_df.to_csv(os.path.join(script_dir, "combined_data_with_word_counts.csv"), index=False)
-print("Word counting completed.")
\ No newline at end of file
+print("Importance signals collected.")
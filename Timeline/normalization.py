@@ -10,10 +10,10 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 
 # Read both cleaned CSV files
 df = pd.read_csv(os.path.join(script_dir, "combined_data_with_word_counts.csv"))
-# Normalize word_counts to a deviation from mean score
-mean_word_count = df['word_counts'].mean()
+# Normalize the article length to a deviation from mean score
+mean_page_length = df['page_length'].mean()
 
-df['importance_score'] = df['word_counts'].apply(lambda x: (x - mean_word_count) )
+df['importance_score'] = df['page_length'].apply(lambda x: (x - mean_page_length) )
 
 # Save the updated DataFrame with importance scores
 df.to_csv(os.path.join(script_dir, "combined_data_with_importance_scores.csv"), index=False)
@@ -0,0 +1,28 @@
+import os
+import pandas as pd
+from llm_categorizer import CategoryCache, LLMCategorizer
+# The current script's directory
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Automated replacement for 02_isolate_titles.py + labeling the batches by hand:
+# every event title gets its categories from the cache or, if it is new, from the LLM endpoint
+df = pd.read_csv(os.path.join(script_dir, "./final data/cleaned_data.csv"))
+
+#drop all rows with death in the category column
+df = df[df['category'] != 'death']
+
+# Titles labeled by hand in batches/gemini_results are reused as they are
+cache = CategoryCache()
+print(f"{cache.seed_from_results()} hand-labeled titles in the cache")
+
+categories = LLMCategorizer().categorize(df['title'].tolist(), cache)
+
+# One row per title, in the same id,title,category layout as the gemini_results batches
+titles_df = df[['title']].drop_duplicates().copy()
+titles_df.insert(0, 'id', range(1, 1 + len(titles_df)))
+titles_df['category'] = titles_df['title'].map(categories).fillna('')
+print(f"{(titles_df['category'] == '').sum()} titles are still unlabeled")
+
+# 03_merger.py reads this file instead of the gemini_results batches when it exists
+titles_df.to_csv(os.path.join(script_dir, "./final data/categorized_titles.csv"), index=False, encoding='utf-8-sig')
+print("Categories saved to categorized_titles.csv")
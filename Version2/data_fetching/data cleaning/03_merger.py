@@ -3,12 +3,17 @@ import pandas as pd
 # The current script's directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
-#import all batch files and merge them into a single dataframe
-batch_files = [f for f in os.listdir(os.path.join(script_dir, "./final data/batches/gemini_results/")) if f.endswith(".csv")]
-merged_df = pd.DataFrame()
-for file in batch_files:
-    batch_df = pd.read_csv(os.path.join(script_dir, "./final data/batches/gemini_results/", file))
-    merged_df = pd.concat([merged_df, batch_df], ignore_index=True)
+# Categories from 02_auto_categorize.py when it has been run, otherwise the hand-labeled batches
+categorized_path = os.path.join(script_dir, "./final data/categorized_titles.csv")
+if os.path.exists(categorized_path):
+    merged_df = pd.read_csv(categorized_path)
+else:
+    #import all batch files and merge them into a single dataframe
+    batch_files = [f for f in os.listdir(os.path.join(script_dir, "./final data/batches/gemini_results/")) if f.endswith(".csv")]
+    merged_df = pd.DataFrame()
+    for file in batch_files:
+        batch_df = pd.read_csv(os.path.join(script_dir, "./final data/batches/gemini_results/", file))
+        merged_df = pd.concat([merged_df, batch_df], ignore_index=True)
 
 # import the main df with titles
 main_df = pd.read_csv(os.path.join(script_dir, "./final data/cleaned_data.csv"))
@@ -53,8 +58,8 @@ final_df.insert(0, 'id', id_col)
 if 'death' in final_df.columns:
     final_df = final_df.rename(columns={'death': 'Death'})
 
-#drop event and category columns
-final_df = final_df.drop(columns=['event', 'category'])
+#drop event and category columns (there is no event column once every title is labeled)
+final_df = final_df.drop(columns=['event', 'category'], errors='ignore')
 
 #if each row has not id assing id to it
 for i in range(len(final_df)):
@@ -0,0 +1,183 @@
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# The shared rate limiter and text normalization live in Wikipedia_data_collector
+sys.path.append(os.path.join(script_dir, '..', '..', '..', 'Wikipedia_data_collector'))
+from rate_limiter import get_limiter, parse_retry_after
+from translation_memory import normalize_text
+
+# The labels used for the hand-run Gemini batches in final data/batches/gemini_results
+CATEGORIES = ['Crime/Safety', 'Economy', 'Health', 'Natural Disaster', 'Politics', 'Social',
+              'Sports/Entertainment', 'Technology/Science']
+
+# Any endpoint that speaks the Gemini generateContent protocol; llm_stub.py serves one locally:
+#   LLM_ENDPOINT=http://127.0.0.1:8090/v1beta/models/stub:generateContent python 02_auto_categorize.py
+LLM_ENDPOINT = os.environ.get(
+    'LLM_ENDPOINT', 'https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent')
+LLM_API_KEY = os.environ.get('LLM_API_KEY', os.environ.get('GEMINI_API_KEY'))
+BATCH_SIZE = 100
+MAX_WORKERS = 4
+MAX_RETRIES = 4
+TIMEOUT = 120
+
+CACHE_PATH = os.path.join(script_dir, 'final data', 'category_cache.sqlite')
+GEMINI_RESULTS_DIR = os.path.join(script_dir, 'final data', 'batches', 'gemini_results')
+
+
+def title_key(title):
+    return hashlib.sha1(normalize_text(title).encode('utf-8')).hexdigest()
+
+
+class CategoryCache:
+    """SQLite store of the categories of every labeled title, keyed by a hash of the normalized title"""
+
+    def __init__(self, path=CACHE_PATH):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS categories ("
+            "title_hash TEXT PRIMARY KEY, title TEXT, category TEXT, source TEXT, labeled_at REAL)"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, titles):
+        """{title: category} for the titles that are already labeled"""
+        keys = {title_key(title): title for title in titles}
+        found = {}
+        with self._lock:
+            items = list(keys.items())
+            for i in range(0, len(items), 500):
+                chunk = dict(items[i:i + 500])
+                rows = self._db.execute(
+                    f"SELECT title_hash, category FROM categories WHERE title_hash IN ({','.join('?' * len(chunk))})",
+                    list(chunk),
+                ).fetchall()
+                found.update({chunk[key]: category for key, category in rows})
+        return found
+
+    def put_many(self, categories, source, replace=True):
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                f"{verb} INTO categories (title_hash, title, category, source, labeled_at) VALUES (?, ?, ?, ?, ?)",
+                [(title_key(title), title, category, source, now) for title, category in categories.items()],
+            )
+            self._db.commit()
+
+    def seed_from_results(self, results_dir=GEMINI_RESULTS_DIR):
+        # Titles labeled by hand keep their labels: they are only added, never overwritten
+        categories = {}
+        for path in sorted(glob.glob(os.path.join(results_dir, '*.csv'))):
+            batch_df = pd.read_csv(path)
+            for title, category in zip(batch_df['title'], batch_df['category']):
+                if isinstance(title, str) and isinstance(category, str) and category.strip():
+                    categories.setdefault(title, category)
+        self.put_many(categories, 'gemini_results', replace=False)
+        return len(categories)
+
+
+def build_prompt(batch):
+    # The titles go on the last line as JSON so the answer can be matched back by id
+    items = [{'id': i, 'title': title} for i, title in enumerate(batch)]
+    return (
+        "You label events from Iranian history, given by their Persian titles.\n"
+        f"Allowed categories: {', '.join(CATEGORIES)}.\n"
+        "Give every title one or more allowed categories. Answer with only a JSON array of "
+        "objects {\"id\": <id>, \"categories\": [<category>, ...]}, one per title.\n"
+        "Titles:\n" + json.dumps(items, ensure_ascii=False)
+    )
+
+
+def parse_answer(text, batch):
+    """{title: 'Category, Category'} from the model's answer; unknown ids and categories are dropped"""
+    start, end = text.find('['), text.rfind(']')
+    if start == -1 or end == -1:
+        raise ValueError("No JSON array in the answer")
+    categories = {}
+    for item in json.loads(text[start:end + 1]):
+        labels = [label for label in item.get('categories', []) if label in CATEGORIES]
+        if isinstance(item.get('id'), int) and 0 <= item['id'] < len(batch) and labels:
+            categories[batch[item['id']]] = ', '.join(dict.fromkeys(labels))
+    return categories
+
+
+class LLMCategorizer:
+    """Sends batches of titles to a generateContent endpoint, at most max_workers requests at a time"""
+
+    def __init__(self, endpoint=LLM_ENDPOINT, api_key=LLM_API_KEY, batch_size=BATCH_SIZE,
+                 max_workers=MAX_WORKERS):
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.host = urlsplit(endpoint).netloc
+        self.limiter = get_limiter()
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _generate(self, prompt):
+        body = {
+            'contents': [{'parts': [{'text': prompt}]}],
+            'generationConfig': {'responseMimeType': 'application/json', 'temperature': 0},
+        }
+        params = {'key': self.api_key} if self.api_key else None
+        for attempt in range(MAX_RETRIES):
+            self.limiter.wait(self.host)
+            try:
+                response = self._session().post(self.endpoint, params=params, json=body, timeout=TIMEOUT)
+            except requests.RequestException as e:
+                print(f"Request to {self.host} failed: {e}")
+                self.limiter.throttle(self.host)
+                continue
+            if response.status_code in (429, 500, 502, 503, 504):
+                print(f"Throttled by {self.host} (status {response.status_code}), backing off")
+                self.limiter.throttle(self.host, parse_retry_after(response.headers.get('Retry-After')))
+                continue
+            response.raise_for_status()
+            self.limiter.success(self.host)
+            return response.json()['candidates'][0]['content']['parts'][0]['text']
+        raise RuntimeError(f"No answer from {self.host} after {MAX_RETRIES} attempts")
+
+    def categorize_batch(self, batch):
+        return parse_answer(self._generate(build_prompt(batch)), batch)
+
+    def categorize(self, titles, cache):
+        """{title: category} for titles; only titles missing from the cache are sent to the model"""
+        titles = list(dict.fromkeys(title for title in titles if isinstance(title, str) and title.strip()))
+        categories = cache.get_many(titles)
+        missing = [title for title in titles if title not in categories]
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        print(f"{len(titles)} titles, {len(categories)} already labeled, "
+              f"{len(missing)} to label in {len(batches)} requests")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.categorize_batch, batch): batch for batch in batches}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    labeled = future.result()
+                except Exception as e:
+                    print(f"Batch failed, its titles stay unlabeled until the next run: {e}")
+                    continue
+                # Stored right away, so an interrupted run keeps what it already paid for
+                cache.put_many(labeled, self.endpoint)
+                categories.update(labeled)
+                print(f"Labeled batch {done}/{len(batches)} ({len(labeled)}/{len(futures[future])} titles)")
+        return categories
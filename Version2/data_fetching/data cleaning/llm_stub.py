@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import json
+import random
+
+from aiohttp import web
+
+# Offline stand-in for the Gemini generateContent endpoint used by llm_categorizer.py.
+# It labels titles with simple keyword rules, so runs are fast, free and repeatable:
+#   python llm_stub.py --port 8090
+#   LLM_ENDPOINT=http://127.0.0.1:8090/v1beta/models/stub:generateContent python 02_auto_categorize.py
+
+KEYWORDS = {
+    'Politics': ['جنگ', 'عهدنامه', 'پیمان', 'انقلاب', 'کودتا', 'مجلس', 'شاه', 'دولت', 'انتخابات', 'حکومت'],
+    'Crime/Safety': ['ترور', 'قتل', 'اعدام', 'محاصره', 'حمله', 'شورش', 'انفجار', 'سقوط'],
+    'Natural Disaster': ['زمین‌لرزه', 'زلزله', 'سیل', 'طوفان', 'خشکسالی'],
+    'Economy': ['بانک', 'نفت', 'اقتصاد', 'تجارت', 'شرکت', 'پول'],
+    'Health': ['بیماری', 'وبا', 'طاعون', 'بیمارستان', 'واکسن'],
+    'Technology/Science': ['دانشگاه', 'راه‌آهن', 'تلگراف', 'فضا', 'ماهواره', 'علمی'],
+    'Sports/Entertainment': ['فوتبال', 'المپیک', 'فیلم', 'سینما', 'جام', 'بازی'],
+}
+
+
+def label(title):
+    categories = [category for category, words in KEYWORDS.items() if any(word in title for word in words)]
+    return categories or ['Social']
+
+
+def make_app(latency=0.0, error_rate=0.0, seed=None):
+    rng = random.Random(seed)
+    stats = {'requests': 0, 'titles': 0, 'errors': 0}
+
+    async def generate(request):
+        if latency > 0:
+            await asyncio.sleep(latency)
+        if rng.random() < error_rate:
+            stats['errors'] += 1
+            return web.Response(status=429, headers={'Retry-After': '1'}, text='Resource exhausted')
+        body = await request.json()
+        prompt = body['contents'][0]['parts'][0]['text']
+        # The titles are the JSON on the last line of the prompt
+        items = json.loads(prompt.rsplit('\n', 1)[1])
+        answer = [{'id': item['id'], 'categories': label(item['title'])} for item in items]
+        stats['requests'] += 1
+        stats['titles'] += len(items)
+        return web.json_response({'candidates': [{'content': {'parts': [
+            {'text': json.dumps(answer, ensure_ascii=False)}]}}]})
+
+    async def show_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app['stats'] = stats
+    app.router.add_get('/_stats', show_stats)
+    app.router.add_post('/{tail:.*}', generate)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the LLM categorization endpoint")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    web.run_app(make_app(args.latency, args.error_rate, args.seed), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 
 import pandas as pd
 import os
-import re
+from text_normalization import persian_digits_only
 # The current script's directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -9,17 +9,13 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 deaths_df=pd.read_csv(script_dir+"/deaths.csv")
 events_df=pd.read_csv(script_dir+"/events.csv")
 
-# Remove anything except Persian digits and spaces, then remove spaces, then translate Persian digits to English
-deaths_df['year'] = deaths_df['year'].astype(str).apply(lambda x: re.sub(r'[^\u06F0-\u06F9 ]', '', x))
-deaths_df['year'] = deaths_df['year'].str.replace(' ', '', regex=False)
-deaths_df['year'] = deaths_df['year'].str.translate(str.maketrans('۰۱۲۳۴۵۶۷۸۹', '0123456789'))
+# Keep only the Persian digits of the year, translated to English digits
+deaths_df['year'] = persian_digits_only(deaths_df['year'])
 deaths_df = deaths_df[deaths_df['year'] != '']  # Remove empty years
 deaths_df['year'] = deaths_df['year'].astype(int)
 
 
-events_df['year'] = events_df['year'].astype(str).apply(lambda x: re.sub(r'[^\u06F0-\u06F9 ]', '', x))
-events_df['year'] = events_df['year'].str.replace(' ', '', regex=False)
-events_df['year'] = events_df['year'].str.translate(str.maketrans('۰۱۲۳۴۵۶۷۸۹', '0123456789'))
+events_df['year'] = persian_digits_only(events_df['year'])
 events_df = events_df[events_df['year'] != '']  # Remove empty years
 events_df['year'] = events_df['year'].astype(int)
 
@@ -1,9 +1,15 @@
-import wikipediaapi
 import pandas as pd
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
+import sys
+from page_cache import get_page_cache
+from wiki_api import fetch_revids, title_from_url
+from crawl_manifest import load_manifest, save_manifest, changed_pages, splice_rows
+from checkpoint import StreamingWriter
+from fetch_pipeline import fetch_and_parse
+from link_index import LinkIndex
+from section_splitter import split_sections
+from text_normalization import PERSIAN_MONTHS, remove_month_names, merge_day_month_rows
 
 # The current script's directory
 script_dir = os.path.dirname(os.path.abspath(__file__)) 
@@ -14,23 +20,17 @@ final_events_df = pd.DataFrame()
 final_deaths_df = pd.DataFrame()
 
 # Get the wikiperdia full text of a page with url 
-@lru_cache(maxsize=1000)
-def get_wikipedia_page_content(url):
-    wiki_wiki = wikipediaapi.Wikipedia(user_agent= "Iranian Timeline asghariali9877@gmail.com", language=   'fa')
-    page_title = url.split("/wiki/")[-1]
-    page = wiki_wiki.page(page_title)
-    if page.exists():
-        return {
-            'text': page.text,
-            'links': {title: link.fullurl for title, link in page.links.items() if link.exists()}
-        }
-    return None
+# Pages are kept in the on-disk cache (page_cache.py); set WIKI_CACHE_MODE=cache_only to run offline
+def get_wikipedia_page_content(url, revid=None):
+    return get_page_cache().get_page_content(url, lang='fa', latest_revid=revid)
 
 
 def parse_wikipedia_content(page):
     # Read the content
     content = page['text']
     links_dict = page['links']
+    # Finds every page link contained in a line in one pass over the line
+    link_index = LinkIndex(links_dict)
 
     # Initialize lists for events and deaths
     events_data = []
@@ -38,28 +38,18 @@ def parse_wikipedia_content(page):
     
     # Initialize variables
     current_month = None
-    persian_months = {
-        'فروردین': 1, 'اردیبهشت': 2, 'خرداد': 3,
-        'تیر': 4, 'مرداد': 5, 'شهریور': 6,
-        'مهر': 7, 'آبان': 8, 'آذر': 9,
-        'دی': 10, 'بهمن': 11, 'اسفند': 12,
-    }
+    persian_months = PERSIAN_MONTHS
+
+    # Find the events and deaths sections in one pass over the heading lines
+    sections = split_sections(content)
 
     # Parse events section
-    events_section = re.search(r'رویداد ها\n(.*?)زادروزها', content, re.DOTALL)
-    if events_section==None:
-        events_section = re.search(r'رویدادها\n(.*?)زادروزها', content, re.DOTALL)
-        if events_section==None:
-            events_section = re.search(r'رویدادهای داخلی\n(.*?)زادروزها', content, re.DOTALL)
-            if events_section==None:
-                events_section = re.search(r'رویدادها\n(.*?)درگذشتگان', content, re.DOTALL)
-                if events_section==None:
-                    events_section = re.search(r'رویدادها\n(.*?)پدیده‌های', content, re.DOTALL)
-                    if events_section==None:
-                        print("No events section found!!")
+    events_section = sections.get('events')
+    if events_section is None:
+        print("No events section found!!")
     if events_section:
         current_month = None
-        for line in events_section.group(1).split('\n'):
+        for line in events_section.text.split('\n'):
             event_links = []
             line = line.strip()
             # Skip empty lines
@@ -74,16 +64,13 @@ def parse_wikipedia_content(page):
             # Handle lines with dash/hyphen
             if '–' in line or '-' in line:
                 # First remove month name if it appears in the line
-                for month in persian_months:
-                    line = line.replace(f' {month}', '')
+                line = remove_month_names(line)
                 
                 parts = re.split('–|-', line, 1)
                 if len(parts) == 2:
                     day = parts[0].strip()
                     title = parts[1].strip()
-                    for link, url in links_dict.items():
-                        if link in title:  # Check if link text appears in event title
-                            event_links.append({'text': link, 'url': url})
+                    event_links = link_index.matches(title)
                     if day.isdigit():
                         events_data.append({
                             'day': int(day),
@@ -101,9 +88,7 @@ def parse_wikipedia_content(page):
                         })
             # Handle lines without dash but with content
             elif line and current_month and not line in persian_months:
-                for link, url in links_dict.items():
-                    if link in line:  # Check if link text appears in event title
-                        event_links.append({'text': link, 'url': url})
+                event_links = link_index.matches(line)
                 events_data.append({
                     'day': 0,
                     'month': current_month,
@@ -113,17 +98,11 @@ def parse_wikipedia_content(page):
 
 
     # Parse deaths section
-    deaths_section = re.search(r'درگذشت‌ها\n(.*)', content, re.DOTALL)
-    if deaths_section==None:
-        deaths_section = re.search(r'درگذشتگان\n(.*?)', content, re.DOTALL)
-        if deaths_section==None:
-            deaths_section = re.search(r'درگذشت‌ها\n(.*?)', content, re.DOTALL)
-            if deaths_section==None:
-                deaths_section = re.search(r'مرگ‌ها\n(.*)', content, re.DOTALL)
-                if deaths_section==None:
-                    print("No deaths section found!!")
+    deaths_section = sections.get('deaths')
+    if deaths_section is None:
+        print("No deaths section found!!")
     if deaths_section:
-        for line in deaths_section.group(1).split('\n'):
+        for line in deaths_section.text.split('\n'):
             person_links = []
             if '–' in line or '-' in line:
                 parts = re.split('–|-', line, 1)
@@ -139,9 +118,7 @@ def parse_wikipedia_content(page):
                             person_details = parts[1].strip().split(':', 1)
                         person = person_details[0].strip()
                         details = person_details[1].strip() if len(person_details) > 1 else ""
-                        for title, url in links_dict.items():
-                            if title in person:
-                                person_links.append({'text': title, 'url': url})
+                        person_links = link_index.matches(person)
                         deaths_data.append({
                             'day': day,
                             'month': month,
@@ -153,59 +130,97 @@ def parse_wikipedia_content(page):
     # Create DataFrames
     events_df = pd.DataFrame(events_data)
     deaths_df = pd.DataFrame(deaths_data)
-    
-    return events_df, deaths_df
-
-
-def process_year(row):
-    year = row['Year']
-    url = row['Wiki_URL']
-    print(f"Processing year: {year}")
-    page_content = get_wikipedia_page_content(url)
-    if page_content:
-        events_df, deaths_df = parse_wikipedia_content(page_content)
-        events_df['year'] = year
-        deaths_df['year'] = year
-        return events_df, deaths_df
-    return None
-
-def main():
+    # Which heading every section was found under, for the section coverage report
+    headings = {kind: section.alias for kind, section in sections.items()}
+
+    return events_df, deaths_df, headings
+
+
+def fetch_year_page(row):
+    print(f"Processing year: {row['Year']}")
+    revid = row.get('revid')
+    return get_wikipedia_page_content(row['Wiki_URL'], int(revid) if pd.notna(revid) else None)
+
+
+def parse_year_page(page):
+    # Runs in a worker process of the fetch pipeline
+    events_df, deaths_df, headings = parse_wikipedia_content(page)
+    return merge_day_month_rows(events_df), deaths_df, headings
+
+def main(incremental=False):
     script_dir = os.path.dirname(os.path.abspath(__file__))
     link_files = pd.read_csv(os.path.join(script_dir, 'years_with_url.csv'))
+    events_path = os.path.join(script_dir, 'events.csv')
+    deaths_path = os.path.join(script_dir, 'deaths.csv')
+    coverage_path = os.path.join(script_dir, 'section_coverage.csv')
+    manifest_path = os.path.join(script_dir, 'crawl_manifest.json')
+    checkpoint_path = os.path.join(script_dir, 'crawl_checkpoint.jsonl')
+
+    # Latest revision of every year page, 50 titles per request
+    revids = fetch_revids('fa', [title_from_url(url) for url in link_files['Wiki_URL']])
+    link_files['revid'] = [revids.get(title_from_url(url)) for url in link_files['Wiki_URL']]
+    manifest = load_manifest(manifest_path)
+
+    # Incremental mode only re-parses the pages that changed since the last crawl
+    if incremental and os.path.exists(events_path) and os.path.exists(deaths_path):
+        link_files = link_files[changed_pages(link_files['Wiki_URL'], link_files['revid'], manifest)]
+        print(f"{len(link_files)} year pages changed since the last crawl")
+        if link_files.empty:
+            return
+    else:
+        incremental = False
     
-    # Process years in parallel
-    events_list = []
-    deaths_list = []
-    
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = [executor.submit(process_year, row) for _, row in link_files.iterrows()]
-        for future in futures:
-            result = future.result()
-            if result:
-                events_df, deaths_df = result
-                events_list.append(events_df)
-                deaths_list.append(deaths_df)
-
-    # Combine results
-    final_events_df = pd.concat(events_list, ignore_index=True)
-    final_deaths_df = pd.concat(deaths_list, ignore_index=True)
-
-    # Optimize multiple events processing using vectorized operations
-    day_month_mask = final_events_df['title'].str.match(r'^\d+\s+[آ-ی]+$')
-    day_month_rows = final_events_df[day_month_mask]
-    for idx in day_month_rows.index:
-        day = int(final_events_df.loc[idx, 'title'].split()[0])
-        if idx + 1 < len(final_events_df):
-            final_events_df.loc[idx+1:idx+2, 'day'] = day
-
-    # Drop day-month rows more efficiently
-    final_events_df = final_events_df[~day_month_mask].reset_index(drop=True)
-
-    # Save results
-    final_events_df.to_csv(os.path.join(script_dir, 'events.csv'), 
-                          index=False, encoding='utf-8-sig')
-    final_deaths_df.to_csv(os.path.join(script_dir, 'deaths.csv'), 
-                          index=False, encoding='utf-8-sig')
+    # Stream every finished page to disk; an interrupted run resumes from the checkpoint
+    output_paths = {'events': events_path, 'deaths': deaths_path, 'coverage': coverage_path}
+    writer = StreamingWriter(checkpoint_path, output_paths)
+    todo = link_files[[not writer.done(url, int(revid) if pd.notna(revid) else None)
+                       for url, revid in zip(link_files['Wiki_URL'], link_files['revid'])]]
+
+    # Fetch pages in threads and parse them in worker processes, writing each page as soon as it is done
+    rows = [row for _, row in todo.iterrows()]
+    for row, (events_df, deaths_df, headings) in fetch_and_parse(rows, fetch_year_page, parse_year_page):
+        events_df['year'] = row['Year']
+        deaths_df['year'] = row['Year']
+        # One row per page: the headings the sections were found under and how many rows they gave
+        coverage_df = pd.DataFrame([{
+            'year': row['Year'],
+            'url': row['Wiki_URL'],
+            'events_heading': headings.get('events'),
+            'deaths_heading': headings.get('deaths'),
+            'events': len(events_df),
+            'deaths': len(deaths_df),
+        }])
+        revid = int(row['revid']) if pd.notna(row['revid']) else None
+        writer.append(row['Wiki_URL'], revid, {'events': events_df, 'deaths': deaths_df, 'coverage': coverage_df})
+
+    if not any(url in writer.pages for url in link_files['Wiki_URL']):
+        print("No pages could be processed")
+        return
+
+    # Write the pages in year order
+    if incremental:
+        # Splice the re-parsed pages into the previous outputs
+        changed_paths = {name: path + '.changed' for name, path in output_paths.items()}
+        writer.finish(link_files['Wiki_URL'], changed_paths)
+        # Only the pages that were written replace their old rows; a page that failed keeps them
+        written = link_files[link_files['Wiki_URL'].isin(writer.pages)]
+        changed_years = written[['Year']].rename(columns={'Year': 'year'})
+        for name, path in output_paths.items():
+            changed_df = pd.read_csv(changed_paths[name]) if os.path.getsize(changed_paths[name]) else pd.DataFrame(columns=['year'])
+            os.remove(changed_paths[name])
+            # A coverage report from before the last crawl may not exist yet
+            existing_df = pd.read_csv(path) if os.path.exists(path) else changed_df.iloc[:0]
+            splice_rows(existing_df, changed_df, ['year'], changed_years).to_csv(
+                path, index=False, encoding='utf-8-sig')
+    else:
+        writer.finish(link_files['Wiki_URL'])
+
+    # Remember which revision every written page was parsed from
+    for url, revid in zip(link_files['Wiki_URL'], link_files['revid']):
+        if pd.notna(revid) and url in writer.pages:
+            manifest[url] = int(revid)
+    save_manifest(manifest_path, manifest)
 
 if __name__ == '__main__':
-    main()
+    # python Datacollectionwith_API.py --incremental
+    main(incremental='--incremental' in sys.argv)
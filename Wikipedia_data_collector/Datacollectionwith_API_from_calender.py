@@ -1,56 +1,46 @@
-import wikipediaapi
 import pandas as pd
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
+import sys
+from page_cache import get_page_cache
+from wiki_api import fetch_revids, title_from_url
+from crawl_manifest import load_manifest, save_manifest, changed_pages, splice_rows
+from checkpoint import StreamingWriter
+from fetch_pipeline import fetch_and_parse
+from link_index import LinkIndex
+from section_splitter import split_sections
+from text_normalization import PERSIAN_MONTHS
 
 # Get the wikiperdia full text of a page with url 
-@lru_cache(maxsize=1000)
-def get_wikipedia_page_content(url):
-    wiki_wiki = wikipediaapi.Wikipedia(user_agent= "Iranian Timeline asghariali9877@gmail.com", language=   'fa')
-    page_title = url.split("/wiki/")[-1]
-    page = wiki_wiki.page(page_title)
-    if page.exists():
-        return {
-            'text': page.text,
-            'links': {title: link.fullurl for title, link in page.links.items() if link.exists()}
-        }
-    return None
+# Pages are kept in the on-disk cache (page_cache.py); set WIKI_CACHE_MODE=cache_only to run offline
+def get_wikipedia_page_content(url, revid=None):
+    return get_page_cache().get_page_content(url, lang='fa', latest_revid=revid)
 
 
 def parse_wikipedia_content(page):
     # Read the content
     content = page['text']
     links_dict = page['links']
+    # Finds every page link contained in a line in one pass over the line
+    link_index = LinkIndex(links_dict)
 
     # Initialize lists for events and deaths
     events_data = []
     deaths_data = []
     
     # Initialize variables
-    persian_months = {
-        'فروردین': 1, 'اردیبهشت': 2, 'خرداد': 3,
-        'تیر': 4, 'مرداد': 5, 'شهریور': 6,
-        'مهر': 7, 'آبان': 8, 'آذر': 9,
-        'دی': 10, 'بهمن': 11, 'اسفند': 12
-    }
+    persian_months = PERSIAN_MONTHS
+
+    # Find the events and deaths sections in one pass over the heading lines
+    sections = split_sections(content)
 
     # Parse events section
-    events_section = re.search(r'رویداد ها\n(.*?)زادروزها', content, re.DOTALL)
-    if events_section==None:
-        events_section = re.search(r'رویدادها\n(.*?)زادروزها', content, re.DOTALL)
-        if events_section==None:
-            events_section = re.search(r'رویدادهای داخلی\n(.*?)زادروزها', content, re.DOTALL)
-            if events_section==None:
-                events_section = re.search(r'رویدادها\n(.*?)درگذشتگان', content, re.DOTALL)
-                if events_section==None:
-                    events_section = re.search(r'رویدادها\n(.*?)پدیده‌های', content, re.DOTALL)
-                    if events_section==None:
-                        print("No events section found!!")
+    events_section = sections.get('events')
+    if events_section is None:
+        print("No events section found!!")
     if events_section:
         current_year = None
-        for line in events_section.group(1).split('\n'):
+        for line in events_section.text.split('\n'):
             event_links = []
             if line:
                 current_year = line.split()[0]
@@ -68,9 +58,7 @@ def parse_wikipedia_content(page):
                 if len(parts) == 2:
                     title = parts[1].strip()
                     #print(f"Title: {title}")###########################
-                    for link, url in links_dict.items():
-                        if link in title:  # Check if link text appears in event title
-                            event_links.append({'text': link, 'url': url})
+                    event_links = link_index.matches(title)
                     if current_year.isdigit():
                         events_data.append({
                             'years': int(current_year),
@@ -79,9 +67,7 @@ def parse_wikipedia_content(page):
                         })
             # Handle lines without dash but with content
             """elif line and current_month and not line in persian_months:
-                for link, url in links_dict.items():
-                    if link in line:  # Check if link text appears in event title
-                        event_links.append({'text': link, 'url': url})
+                event_links = link_index.matches(line)
                 events_data.append({
                     'day': 0,
                     'month': current_month,
@@ -91,17 +77,11 @@ def parse_wikipedia_content(page):
 
 
     # Parse deaths section
-    deaths_section = re.search(r'درگذشت‌ها\n(.*)', content, re.DOTALL)
-    if deaths_section==None:
-        deaths_section = re.search(r'درگذشتگان\n(.*?)', content, re.DOTALL)
-        if deaths_section==None:
-            deaths_section = re.search(r'درگذشت‌ها\n(.*?)', content, re.DOTALL)
-            if deaths_section==None:
-                deaths_section = re.search(r'مرگ‌ها\n(.*)', content, re.DOTALL)
-                if deaths_section==None:
-                    print("No deaths section found!!")
+    deaths_section = sections.get('deaths')
+    if deaths_section is None:
+        print("No deaths section found!!")
     if deaths_section:
-        for line in deaths_section.group(1).split('\n'):
+        for line in deaths_section.text.split('\n'):
             person_links = []
             if '–' in line or '-' in line:
                 parts = re.split('–|-', line, 1)
@@ -113,9 +93,7 @@ def parse_wikipedia_content(page):
                         person_details = parts[1].strip().split(':', 1)
                     person = person_details[0].strip()
                     details = person_details[1].strip() if len(person_details) > 1 else ""
-                    for title, url in links_dict.items():
-                        if title in person:
-                            person_links.append({'text': title, 'url': url})
+                    person_links = link_index.matches(person)
                     deaths_data.append({
                             'year': year,
                             'person': person,
@@ -126,52 +104,95 @@ def parse_wikipedia_content(page):
     # Create DataFrames
     events_df = pd.DataFrame(events_data)
     deaths_df = pd.DataFrame(deaths_data)
-    
-    return events_df, deaths_df
-
-
-def process_year(row):
-    day = row['Day']
-    month = row['Month']
-    url = row['Wiki_URL']
-    print(f"Processing day: {day} of month {month}")
-    page_content = get_wikipedia_page_content(url)
-    if page_content:
-        events_df, deaths_df = parse_wikipedia_content(page_content)
-        events_df['day'] = day
-        deaths_df['day'] = day
-        events_df['month'] = month
-        deaths_df['month'] = month
-        return events_df, deaths_df
-    return None
-
-def main():
+    # Which heading every section was found under, for the section coverage report
+    headings = {kind: section.alias for kind, section in sections.items()}
+
+    return events_df, deaths_df, headings
+
+
+def fetch_day_page(row):
+    print(f"Processing day: {row['Day']} of month {row['Month']}")
+    revid = row.get('revid')
+    return get_wikipedia_page_content(row['Wiki_URL'], int(revid) if pd.notna(revid) else None)
+
+def main(incremental=False):
     script_dir = os.path.dirname(os.path.abspath(__file__))
     link_files = pd.read_csv(os.path.join(script_dir, 'calender_with_url.csv'))
     #link_files= link_files.iloc[0:1,:]
+    events_path = os.path.join(script_dir, 'calender_events.csv')
+    deaths_path = os.path.join(script_dir, 'calender_deaths.csv')
+    coverage_path = os.path.join(script_dir, 'calender_section_coverage.csv')
+    manifest_path = os.path.join(script_dir, 'calender_crawl_manifest.json')
+    checkpoint_path = os.path.join(script_dir, 'calender_crawl_checkpoint.jsonl')
+
+    # Latest revision of every day page, 50 titles per request
+    revids = fetch_revids('fa', [title_from_url(url) for url in link_files['Wiki_URL']])
+    link_files['revid'] = [revids.get(title_from_url(url)) for url in link_files['Wiki_URL']]
+    manifest = load_manifest(manifest_path)
+
+    # Incremental mode only re-parses the pages that changed since the last crawl
+    if incremental and os.path.exists(events_path) and os.path.exists(deaths_path):
+        link_files = link_files[changed_pages(link_files['Wiki_URL'], link_files['revid'], manifest)]
+        print(f"{len(link_files)} day pages changed since the last crawl")
+        if link_files.empty:
+            return
+    else:
+        incremental = False
     
-    # Process years in parallel
-    events_list = []
-    deaths_list = []
-    
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = [executor.submit(process_year, row) for _, row in link_files.iterrows()]
-        for future in futures:
-            result = future.result()
-            if result:
-                events_df, deaths_df = result
-                events_list.append(events_df)
-                deaths_list.append(deaths_df)
-
-    # Combine results
-    final_events_df = pd.concat(events_list, ignore_index=True)
-    final_deaths_df = pd.concat(deaths_list, ignore_index=True)
-
-    # Save results
-    final_events_df.to_csv(os.path.join(script_dir, 'calender_events.csv'), 
-                          index=False, encoding='utf-8-sig')
-    final_deaths_df.to_csv(os.path.join(script_dir, 'calender_deaths.csv'), 
-                          index=False, encoding='utf-8-sig')
+    # Stream every finished page to disk; an interrupted run resumes from the checkpoint
+    output_paths = {'events': events_path, 'deaths': deaths_path, 'coverage': coverage_path}
+    writer = StreamingWriter(checkpoint_path, output_paths)
+    todo = link_files[[not writer.done(url, int(revid) if pd.notna(revid) else None)
+                       for url, revid in zip(link_files['Wiki_URL'], link_files['revid'])]]
+
+    # Fetch pages in threads and parse them in worker processes, writing each page as soon as it is done
+    rows = [row for _, row in todo.iterrows()]
+    for row, (events_df, deaths_df, headings) in fetch_and_parse(rows, fetch_day_page, parse_wikipedia_content):
+        events_df['day'] = row['Day']
+        deaths_df['day'] = row['Day']
+        events_df['month'] = row['Month']
+        deaths_df['month'] = row['Month']
+        # One row per page: the headings the sections were found under and how many rows they gave
+        coverage_df = pd.DataFrame([{
+            'month': row['Month'],
+            'day': row['Day'],
+            'url': row['Wiki_URL'],
+            'events_heading': headings.get('events'),
+            'deaths_heading': headings.get('deaths'),
+            'events': len(events_df),
+            'deaths': len(deaths_df),
+        }])
+        revid = int(row['revid']) if pd.notna(row['revid']) else None
+        writer.append(row['Wiki_URL'], revid, {'events': events_df, 'deaths': deaths_df, 'coverage': coverage_df})
+
+    if not any(url in writer.pages for url in link_files['Wiki_URL']):
+        print("No pages could be processed")
+        return
+
+    # Write the pages in calendar order
+    if incremental:
+        # Splice the re-parsed pages into the previous outputs
+        changed_paths = {name: path + '.changed' for name, path in output_paths.items()}
+        writer.finish(link_files['Wiki_URL'], changed_paths)
+        # Only the pages that were written replace their old rows; a page that failed keeps them
+        written = link_files[link_files['Wiki_URL'].isin(writer.pages)]
+        changed_days = written[['Month', 'Day']].rename(columns={'Month': 'month', 'Day': 'day'})
+        for name, path in output_paths.items():
+            changed_df = pd.read_csv(changed_paths[name]) if os.path.getsize(changed_paths[name]) else pd.DataFrame(columns=['month', 'day'])
+            os.remove(changed_paths[name])
+            # A coverage report from before the last crawl may not exist yet
+            existing_df = pd.read_csv(path) if os.path.exists(path) else changed_df.iloc[:0]
+            splice_rows(existing_df, changed_df, ['month', 'day'], changed_days).to_csv(
+                path, index=False, encoding='utf-8-sig')
+    else:
+        writer.finish(link_files['Wiki_URL'])
+
+    # Remember which revision every written page was parsed from
+    for url, revid in zip(link_files['Wiki_URL'], link_files['revid']):
+        if pd.notna(revid) and url in writer.pages:
+            manifest[url] = int(revid)
+    save_manifest(manifest_path, manifest)
 
 if __name__ == '__main__':
-    main()
+    # python Datacollectionwith_API_from_calender.py --incremental
+    main(incremental='--incremental' in sys.argv)
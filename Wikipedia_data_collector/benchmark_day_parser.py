@@ -0,0 +1,65 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import pandas as pd
+
+from day_page_parser import etree, parse_day_page_lxml, parse_day_page_soup
+
+# Compares the html.parser and lxml paths of scrapper.py on the same day pages
+#   python benchmark_day_parser.py                        # fetch the 366 day pages
+#   python benchmark_day_parser.py --fixtures fixtures    # pages recorded with WIKI_RECORD_DIR
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_pages(fixtures_dir=None):
+    if fixtures_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(fixtures_dir, 'fa.wikipedia.org', '*.json'))):
+            with open(path, encoding='utf-8') as f:
+                fixture = json.load(f)
+            if '/wiki/' in fixture['request'] and fixture['status'] == 200:
+                pages.append(fixture['body'])
+        return pages
+    from wiki_fetch import get_engine
+    calendar = pd.read_csv(os.path.join(script_dir, 'calender_with_url.csv'))
+    return [page for page in get_engine().map_text(list(calendar['Wiki_URL'])) if page is not None]
+
+
+def time_parser(parse, pages, repeat):
+    # Best of `repeat` runs over all pages
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [parse(page) for page in pages]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the day page parsers of scrapper.py")
+    parser.add_argument('--fixtures', default=None, help="directory recorded with WIKI_RECORD_DIR")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    print(f"{len(pages)} pages, {sum(len(page) for page in pages) / 1e6:.1f}M characters")
+    if etree is None:
+        print("lxml is not installed, nothing to compare")
+        return
+
+    soup_time, soup_results = time_parser(parse_day_page_soup, pages, args.repeat)
+    lxml_time, lxml_results = time_parser(parse_day_page_lxml, pages, args.repeat)
+    print(f"html.parser: {soup_time:.2f}s")
+    print(f"lxml:        {lxml_time:.2f}s ({soup_time / lxml_time:.0f}x faster)")
+
+    mismatches = [i for i, (a, b) in enumerate(zip(soup_results, lxml_results)) if a != b]
+    print(f"{len(mismatches)} pages with different results")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Throughput and output check of every parser over the golden page corpus (build_golden_pages.py):
+#   python benchmark_parsers.py                    # pages/sec and rows/sec, diff against the golden outputs
+#   python benchmark_parsers.py --update           # accept the current rows and record local throughput
+#   python benchmark_parsers.py --parsers year_pages,day_html --repeat 5
+#
+# The golden outputs are the rows of the original parsers (golden_pages/expected, recorded by
+# record_baseline_outputs.py), with the rows the rewritten parsers change on purpose laid over
+# them (golden_pages/accepted_changes.json, written by --update after checking every difference).
+# Exits with status 1 when a parser's rows differ from the golden outputs, or when its rows/sec
+# is more than --threshold below golden_pages/throughput.json.
+#
+# throughput.json is written on this machine by --update and is not checked in, so a run is only
+# compared with earlier runs of the same machine. Without it, or with --no-speed-check on a busy
+# host, throughput is printed but not checked.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(script_dir, 'golden_pages')
+EXPECTED_DIR = os.path.join(GOLDEN_DIR, 'expected')
+ACCEPTED_PATH = os.path.join(GOLDEN_DIR, 'accepted_changes.json')
+THROUGHPUT_PATH = os.path.join(GOLDEN_DIR, 'throughput.json')
+THRESHOLD = 0.25
+
+
+def frame_rows(df):
+    # JSON-safe rows, so parser output compares equal to what was saved
+    return json.loads(df.to_json(orient='records', force_ascii=False)) if not df.empty else []
+
+
+def page_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def load_pages(kind):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(GOLDEN_DIR, 'pages', f'{kind}_*.json'))):
+        with open(path, encoding='utf-8') as f:
+            pages[page_name(path)] = json.load(f)
+    return pages
+
+
+def load_html_pages():
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(GOLDEN_DIR, 'html', '*.html'))):
+        with open(path, encoding='utf-8') as f:
+            pages[page_name(path)] = f.read()
+    return pages
+
+
+def load_scrapper2_rows():
+    return {'scrapper2': (pd.read_csv(os.path.join(GOLDEN_DIR, 'scrapper2_events.csv')),
+                          pd.read_csv(os.path.join(GOLDEN_DIR, 'scrapper2_deaths.csv')))}
+
+
+# Every parser is (load its inputs, parse one input, turn the parse result into {section: rows}).
+# Imports are done when a parser is used, so one broken parser does not stop the others.
+def year_pages():
+    from Datacollectionwith_API import parse_year_page
+    return load_pages('year'), parse_year_page, lambda result: {
+        'events': frame_rows(result[0]), 'deaths': frame_rows(result[1])}
+
+
+def day_pages():
+    from Datacollectionwith_API_from_calender import parse_wikipedia_content
+    return load_pages('day'), parse_wikipedia_content, lambda result: {
+        'events': frame_rows(result[0]), 'deaths': frame_rows(result[1])}
+
+
+def day_html():
+    from day_page_parser import parse_day_page
+    return load_html_pages(), parse_day_page, lambda result: {'events': result[0], 'deaths': result[1]}
+
+
+def scrapper2_cleaner():
+    from Scarpper2_Cealner import clean_scraped_data
+    return load_scrapper2_rows(), lambda frames: clean_scraped_data(*frames), lambda result: {
+        'events': frame_rows(result[0]), 'deaths': frame_rows(result[1])}
+
+
+PARSERS = {
+    'year_pages': year_pages,              # Datacollectionwith_API.py
+    'day_pages': day_pages,                # Datacollectionwith_API_from_calender.py
+    'day_html': day_html,                  # scrapper.py
+    'scrapper2_cleaner': scrapper2_cleaner,  # Scarpper2_Cealner.py
+}
+
+
+def run_parser(inputs, parse, to_rows, repeat):
+    # Best of `repeat` timed runs; rows are converted outside of the timed part and the
+    # parsers' progress prints are silenced
+    best = None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            results = {name: parse(page) for name, page in inputs.items()}
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    outputs = {name: to_rows(result) for name, result in results.items()}
+    return best, outputs
+
+
+def diff_outputs(expected, actual):
+    """Lines describing every page and section whose rows differ from the golden output"""
+    lines = []
+    for name in sorted(set(expected) | set(actual)):
+        if name not in actual:
+            lines.append(f"  {name}: page missing from the corpus run")
+            continue
+        if name not in expected:
+            lines.append(f"  {name}: no golden output (run with --update)")
+            continue
+        for section in sorted(set(expected[name]) | set(actual[name])):
+            old_rows, new_rows = expected[name].get(section, []), actual[name].get(section, [])
+            if old_rows == new_rows:
+                continue
+            changed = sum(a != b for a, b in zip(old_rows, new_rows)) + abs(len(old_rows) - len(new_rows))
+            lines.append(f"  {name} {section}: {len(old_rows)} -> {len(new_rows)} rows, {changed} differ")
+            first = next((i for i, (a, b) in enumerate(zip(old_rows, new_rows)) if a != b),
+                         min(len(old_rows), len(new_rows)))
+            if first < len(old_rows):
+                lines.append(f"    golden: {json.dumps(old_rows[first], ensure_ascii=False)[:200]}")
+            if first < len(new_rows):
+                lines.append(f"    now:    {json.dumps(new_rows[first], ensure_ascii=False)[:200]}")
+    return lines
+
+
+def changed_sections(expected, actual):
+    """{page: {section: changes}} of every page and section whose rows differ from expected
+
+    The changes of a section are {row number: row} when it has as many rows as expected, and
+    all of its rows otherwise.
+    """
+    changes = {}
+    for name, output in actual.items():
+        for section, rows in output.items():
+            old_rows = expected.get(name, {}).get(section)
+            if old_rows == rows:
+                continue
+            if old_rows is not None and len(old_rows) == len(rows):
+                rows = {str(i): row for i, (old_row, row) in enumerate(zip(old_rows, rows)) if old_row != row}
+            changes.setdefault(name, {})[section] = rows
+    return changes
+
+
+def with_changes(expected, changes):
+    golden = {name: dict(output) for name, output in expected.items()}
+    for name, sections in changes.items():
+        for section, rows in sections.items():
+            if isinstance(rows, dict):
+                changed = list(golden[name][section])
+                for i, row in rows.items():
+                    changed[int(i)] = row
+                rows = changed
+            golden.setdefault(name, {})[section] = rows
+    return golden
+
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parsers over the golden page corpus")
+    parser.add_argument('--parsers', default=','.join(PARSERS), help="comma separated subset of: " + ', '.join(PARSERS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="fraction of rows/sec lost against throughput.json that fails the run")
+    parser.add_argument('--no-speed-check', action='store_true',
+                        help="only print the throughput, for hosts too noisy to time on")
+    parser.add_argument('--update', action='store_true',
+                        help="accept the current rows as changes on purpose and record the local throughput")
+    args = parser.parse_args()
+
+    accepted = read_json(ACCEPTED_PATH, {})
+    throughput = read_json(THROUGHPUT_PATH, {})
+    failed = False
+    for parser_name in args.parsers.split(','):
+        inputs, parse, to_rows = PARSERS[parser_name]()
+        if not inputs:
+            print(f"{parser_name}: no pages in {GOLDEN_DIR}, run build_golden_pages.py")
+            failed = True
+            continue
+        elapsed, outputs = run_parser(inputs, parse, to_rows, args.repeat)
+        rows = sum(len(section) for output in outputs.values() for section in output.values())
+        speed = {'pages_per_sec': round(len(inputs) / elapsed, 1), 'rows_per_sec': round(rows / elapsed, 1)}
+        print(f"{parser_name}: {len(inputs)} pages, {rows} rows in {elapsed:.3f}s "
+              f"({speed['pages_per_sec']:.0f} pages/s, {speed['rows_per_sec']:.0f} rows/s)")
+
+        expected = read_json(os.path.join(EXPECTED_DIR, parser_name + '.json'), {})
+        if args.update:
+            accepted[parser_name] = changed_sections(expected, outputs)
+            throughput[parser_name] = speed
+            continue
+
+        changes = accepted.get(parser_name, {})
+        if changes:
+            print(f"  {sum(len(sections) for sections in changes.values())} sections with rows changed on "
+                  f"purpose from the original parser")
+        differences = diff_outputs(with_changes(expected, changes), outputs)
+        if differences:
+            print(f"  rows differ from the golden output on {len(differences)} lines:")
+            print('\n'.join(differences))
+            failed = True
+        reference = throughput.get(parser_name)
+        if reference:
+            ratio = speed['rows_per_sec'] / reference['rows_per_sec']
+            print(f"  {ratio:.2f}x the {reference['rows_per_sec']:.0f} rows/s of throughput.json")
+            if ratio < 1 - args.threshold and not args.no_speed_check:
+                print(f"  more than {args.threshold:.0%} slower than throughput.json")
+                failed = True
+
+    if args.update:
+        write_json(ACCEPTED_PATH, accepted)
+        write_json(THROUGHPUT_PATH, throughput)
+        print(f"Accepted changes and local throughput written to {GOLDEN_DIR}")
+    elif failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
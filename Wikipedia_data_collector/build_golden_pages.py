@@ -0,0 +1,219 @@
+import argparse
+import ast
+import html
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from text_normalization import PERSIAN_MONTHS
+
+# Builds the golden page corpus that benchmark_parsers.py runs every parser over:
+#   golden_pages/pages/year_<year>.json         text + links of a year page (Datacollectionwith_API.py)
+#   golden_pages/pages/day_<month>_<day>.json   text + links of a day page (Datacollectionwith_API_from_calender.py)
+#   golden_pages/html/day_<month>_<day>.html    HTML of the same day page (scrapper.py)
+#   golden_pages/scrapper2_events.csv / scrapper2_deaths.csv  raw scarpper_2 rows (Scarpper2_Cealner.py)
+#
+#   python build_golden_pages.py          # synthetic pages written from the rows of the last crawl
+#   WIKI_RECORD_DIR=golden_pages/fixtures python build_golden_pages.py --live
+#                                         # the real pages fetched from Wikipedia, with the raw
+#                                         # responses kept as fixtures mediawiki_stub.py can replay
+#
+# The synthetic pages only have the layout the parsers look for, not the markup of real pages,
+# so check in pages fetched with --live whenever there is network access. After rebuilding,
+# record the golden outputs with the original parsers, then accept the changes made on purpose:
+#   python record_baseline_outputs.py
+#   python benchmark_parsers.py --update
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(script_dir, 'golden_pages')
+
+# Every 5th year page plus two days of every month
+YEAR_STEP = 5
+DAYS = (1, 15)
+
+MONTH_NAMES = {number: name for name, number in PERSIAN_MONTHS.items()}
+PERSIAN_DIGITS = str.maketrans('0123456789', '۰۱۲۳۴۵۶۷۸۹')
+# Real pages do not all use the same headings; the rebuilt pages take turns
+EVENTS_HEADINGS = ('رویدادها', 'رویداد ها', 'رویدادهای داخلی')
+DEATHS_HEADINGS = ('درگذشت‌ها', 'درگذشتگان', 'مرگ‌ها')
+
+
+def fa_number(value):
+    return str(int(value)).translate(PERSIAN_DIGITS)
+
+
+def fa_year(value):
+    # Years are numbers in some outputs and Persian digit strings in others
+    if isinstance(value, str):
+        return value
+    return fa_number(value) if pd.notna(value) else ''
+
+
+def row_links(value):
+    # The 'links' columns hold the repr of a list of {'text', 'url'} dicts
+    if not isinstance(value, str) or not value.startswith('['):
+        return []
+    return ast.literal_eval(value)
+
+
+def collect_links(*columns):
+    links = {}
+    for column in columns:
+        for value in column:
+            for link in row_links(value):
+                links.setdefault(link['text'], link['url'])
+    return links
+
+
+def year_page_text(year, events_df, deaths_df, variant):
+    lines = [f"{fa_number(year)} (خورشیدی) سال {fa_number(year)} از گاه‌شماری هجری خورشیدی است.", '',
+             EVENTS_HEADINGS[variant % len(EVENTS_HEADINGS)]]
+    for month, month_df in events_df.groupby('month', sort=True):
+        lines.append(MONTH_NAMES[int(month)])
+        for day, title in zip(month_df['day'], month_df['title']):
+            if pd.notna(day) and day > 0:
+                lines.append(f"{fa_number(day)} {MONTH_NAMES[int(month)]} – {title}")
+            else:
+                lines.append(title)
+    lines += ['', 'زادروزها', '', DEATHS_HEADINGS[variant % len(DEATHS_HEADINGS)]]
+    for day, month, person, details in zip(deaths_df['day'], deaths_df['month'], deaths_df['person'],
+                                           deaths_df['details']):
+        details = f"، {details}" if isinstance(details, str) else ''
+        lines.append(f"{fa_number(day)} {MONTH_NAMES[int(month)]} – {person}{details}")
+    lines += ['', 'منابع', 'پانویس']
+    return '\n'.join(lines)
+
+
+def day_page_text(month, day, events_df, deaths_df, variant):
+    lines = [f"{fa_number(day)} {MONTH_NAMES[month]} روزی از سال هجری خورشیدی است.", '',
+             EVENTS_HEADINGS[variant % 2]]
+    for year, title in zip(events_df['years'], events_df['title']):
+        lines.append(f"{fa_year(year)} – {title}")
+    lines += ['', 'زادروزها', '', DEATHS_HEADINGS[variant % 2]]
+    for year, person, details in zip(deaths_df['year'], deaths_df['person'], deaths_df['details']):
+        details = f"، {details}" if isinstance(details, str) else ''
+        lines.append(f"{fa_year(year)} – {person}{details}")
+    lines += ['', 'تعطیلات و مناسبت‌ها', 'منابع']
+    return '\n'.join(lines)
+
+
+def day_page_html(month, day, events_df, deaths_df):
+    # The MediaWiki markup scrapper.py reads: a list under each heading, year link first
+    def section(section_id, years, titles, links):
+        items = []
+        for year, title, link in zip(years, titles, links):
+            year = fa_year(year)
+            link = (row_links(link) or [None])[0]
+            anchor = (f'<a href="{html.escape(link["url"])}" title="{html.escape(link["text"])}">'
+                      f'{html.escape(link["text"])}</a> ' if link else '')
+            items.append(f'<li><a href="/wiki/{year}" title="{year}">{year}</a> – {anchor}{html.escape(str(title))}</li>')
+        return (f'<div class="mw-heading mw-heading2"><h2 id="{section_id}">{section_id}</h2>'
+                f'<span class="mw-editsection">[<a href="/w/index.php?action=edit">ویرایش</a>]</span></div>'
+                f'<ul>{"".join(items)}</ul>')
+
+    title = f"{fa_number(day)} {MONTH_NAMES[month]}"
+    return (f'<!DOCTYPE html><html lang="fa" dir="rtl"><head><meta charset="UTF-8"><title>{title}</title></head>'
+            f'<body class="mediawiki"><div id="content"><div class="mw-parser-output">'
+            f'<p><b>{title}</b> روزی از سال هجری خورشیدی است.</p>'
+            + section('رویدادها', events_df['years'], events_df['title'], events_df['links'])
+            + section('زادروزها', [], [], [])
+            + section('درگذشت‌ها', deaths_df['year'], deaths_df['person'], deaths_df['person_links'])
+            + '<h2 id="منابع">منابع</h2></div></div></body></html>')
+
+
+def selected_pages():
+    years = pd.read_csv(os.path.join(script_dir, 'years_with_url.csv'))
+    calendar = pd.read_csv(os.path.join(script_dir, 'calender_with_url.csv'))
+    years = years.iloc[::YEAR_STEP]
+    calendar = calendar[calendar['Day'].isin(DAYS)]
+    return years, calendar
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+
+
+def write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def build_from_crawl(years, calendar):
+    year_events = pd.read_csv(os.path.join(script_dir, 'final_data', 'year_calender_events.csv'))
+    year_deaths = pd.read_csv(os.path.join(script_dir, 'final_data', 'year_calender_deaths.csv'))
+    day_events = pd.read_csv(os.path.join(script_dir, 'calender_events.csv'))
+    day_deaths = pd.read_csv(os.path.join(script_dir, 'calender_deaths.csv'))
+
+    for variant, (year, url) in enumerate(zip(years['Year'], years['Wiki_URL'])):
+        events_df = year_events[year_events['year'] == year]
+        deaths_df = year_deaths[year_deaths['year'] == year]
+        if events_df.empty and deaths_df.empty:
+            continue
+        write_json(os.path.join(GOLDEN_DIR, 'pages', f'year_{year}.json'), {
+            'kind': 'year', 'url': url,
+            'text': year_page_text(year, events_df, deaths_df, variant),
+            'links': collect_links(events_df['links'], deaths_df['person_links']),
+        })
+
+    for variant, (month, day, url) in enumerate(zip(calendar['Month'], calendar['Day'], calendar['Wiki_URL'])):
+        events_df = day_events[(day_events['month'] == month) & (day_events['day'] == day)]
+        deaths_df = day_deaths[(day_deaths['month'] == month) & (day_deaths['day'] == day)]
+        name = f'day_{month:02d}_{day:02d}'
+        write_json(os.path.join(GOLDEN_DIR, 'pages', name + '.json'), {
+            'kind': 'day', 'url': url,
+            'text': day_page_text(month, day, events_df, deaths_df, variant),
+            'links': collect_links(events_df['links'], deaths_df['person_links']),
+        })
+        write_text(os.path.join(GOLDEN_DIR, 'html', name + '.html'), day_page_html(month, day, events_df, deaths_df))
+
+
+def build_live(years, calendar):
+    from page_cache import get_page_cache
+    from wiki_fetch import get_engine
+
+    cache = get_page_cache()
+    for year, url in zip(years['Year'], years['Wiki_URL']):
+        page = cache.get_page_content(url, lang='fa')
+        if page is not None:
+            write_json(os.path.join(GOLDEN_DIR, 'pages', f'year_{year}.json'),
+                       {'kind': 'year', 'url': url, 'text': page['text'], 'links': page['links']})
+    names = [f'day_{month:02d}_{day:02d}' for month, day in zip(calendar['Month'], calendar['Day'])]
+    for name, url in zip(names, calendar['Wiki_URL']):
+        page = cache.get_page_content(url, lang='fa')
+        if page is not None:
+            write_json(os.path.join(GOLDEN_DIR, 'pages', name + '.json'),
+                       {'kind': 'day', 'url': url, 'text': page['text'], 'links': page['links']})
+    for name, page in zip(names, get_engine().map_text(list(calendar['Wiki_URL']))):
+        if page is not None:
+            write_text(os.path.join(GOLDEN_DIR, 'html', name + '.html'), page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the golden page corpus of benchmark_parsers.py")
+    parser.add_argument('--live', action='store_true', help="fetch the pages instead of rebuilding them")
+    args = parser.parse_args()
+
+    for subdir in ('pages', 'html'):
+        shutil.rmtree(os.path.join(GOLDEN_DIR, subdir), ignore_errors=True)
+    years, calendar = selected_pages()
+    if args.live:
+        build_live(years, calendar)
+    else:
+        build_from_crawl(years, calendar)
+    # Raw rows of scarpper_2, the input of Scarpper2_Cealner.py
+    for name in ('events', 'deaths'):
+        shutil.copyfile(os.path.join(script_dir, 'everything else', f'{name}.csv'),
+                        os.path.join(GOLDEN_DIR, f'scrapper2_{name}.csv'))
+
+    pages = len(os.listdir(os.path.join(GOLDEN_DIR, 'pages')))
+    print(f"{pages} pages written to {GOLDEN_DIR}")
+    print("Record the golden outputs with: python record_baseline_outputs.py && python benchmark_parsers.py --update")
+
+
+if __name__ == '__main__':
+    main()
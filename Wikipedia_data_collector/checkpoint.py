@@ -0,0 +1,111 @@
+import codecs
+import json
+import os
+
+# Streaming output for the collectors.
+#
+# Every finished page is appended to <output>.partial as one chunk of CSV rows, and the
+# byte range of that chunk is then recorded in the checkpoint (one JSON line per page).
+# A crashed run resumes from the checkpoint: the partial files are cut back to the last
+# recorded chunk and only the pages that are not recorded yet are fetched again.
+# finish() copies the chunks into the final CSV in page order, so neither the crawl nor
+# the final write ever holds more than one page of rows in memory.
+
+BOM = codecs.BOM_UTF8
+
+
+class StreamingWriter:
+    """Append-only CSV outputs plus a per-page checkpoint that an interrupted run resumes from"""
+
+    def __init__(self, checkpoint_path, output_paths):
+        # output_paths maps an output name (e.g. 'events') to the final CSV path
+        self.checkpoint_path = checkpoint_path
+        self.output_paths = output_paths
+        self.partial_paths = {name: path + '.partial' for name, path in output_paths.items()}
+        self.pages = self._load()
+
+    def _load(self):
+        pages = {}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r+b') as f:
+                good_end = 0
+                for line in f:
+                    try:
+                        record = json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        break
+                    pages[record['key']] = record
+                    good_end += len(line)
+                # Cut off the half-written last line of an interrupted run
+                f.truncate(good_end)
+        # Records from before an output was added have no chunk for it
+        ends = {name: max((record['chunks'].get(name, (0, 0))[1] for record in pages.values()), default=0)
+                for name in self.partial_paths}
+        # Partial files missing or shorter than recorded: the checkpoint is useless, start over
+        for name, path in self.partial_paths.items():
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size < ends[name]:
+                print(f"Checkpoint does not match {path}, starting from scratch")
+                self.clear()
+                return {}
+        # Drop rows appended after the last recorded page
+        for name, path in self.partial_paths.items():
+            if os.path.exists(path) and os.path.getsize(path) > ends[name]:
+                with open(path, 'r+b') as f:
+                    f.truncate(ends[name])
+        if pages:
+            print(f"Resuming from checkpoint: {len(pages)} pages already done")
+        return pages
+
+    def done(self, key, revid):
+        # A page is only skipped if it was parsed from the same revision
+        record = self.pages.get(key)
+        return record is not None and revid is not None and record['revid'] == revid
+
+    def append(self, key, revid, frames):
+        """Append the rows of one page ({output name: DataFrame}) and record it in the checkpoint"""
+        chunks = {}
+        for name, path in self.partial_paths.items():
+            df = frames.get(name)
+            with open(path, 'ab') as f:
+                if df is not None and not df.empty:
+                    if f.tell() == 0:
+                        f.write(BOM + df.iloc[:0].to_csv(index=False).encode('utf-8'))
+                    start = f.tell()
+                    f.write(df.to_csv(index=False, header=False).encode('utf-8'))
+                    f.flush()
+                    os.fsync(f.fileno())
+                else:
+                    start = f.tell()
+                chunks[name] = [start, f.tell()]
+        record = {'key': key, 'revid': revid, 'chunks': chunks}
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.pages[key] = record
+
+    def finish(self, keys, output_paths=None):
+        """Write the rows of keys, in that order, to the output CSVs and remove the partial files"""
+        output_paths = output_paths or self.output_paths
+        for name, path in self.partial_paths.items():
+            tmp_path = output_paths[name] + '.tmp'
+            with open(tmp_path, 'wb') as dst:
+                if os.path.exists(path):
+                    with open(path, 'rb') as src:
+                        # Header line (with the BOM), written together with the first chunk
+                        dst.write(src.readline())
+                        for key in keys:
+                            record = self.pages.get(key)
+                            if record is None:
+                                continue
+                            start, end = record['chunks'].get(name, (0, 0))
+                            src.seek(start)
+                            dst.write(src.read(end - start))
+            os.replace(tmp_path, output_paths[name])
+        self.clear()
+
+    def clear(self):
+        for path in list(self.partial_paths.values()) + [self.checkpoint_path]:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,35 @@
+import json
+import os
+
+import pandas as pd
+
+
+# The manifest maps every crawled page url to the revision id its rows were parsed from
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(path, manifest):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def changed_pages(urls, revids, manifest):
+    """Boolean list: True for pages whose revision differs from the manifest (or is unknown)"""
+    return [revid is None or pd.isna(revid) or manifest.get(url) != int(revid) for url, revid in zip(urls, revids)]
+
+
+def splice_rows(existing_df, new_df, key_columns, changed_keys):
+    """Replace the rows of the changed pages in existing_df with new_df, keeping page order
+
+    key_columns identify the page a row came from (['year'] or ['month', 'day']) and
+    changed_keys is a DataFrame with those columns for every re-parsed page.
+    """
+    existing_keys = pd.MultiIndex.from_frame(existing_df[key_columns])
+    changed = pd.MultiIndex.from_frame(changed_keys[key_columns])
+    kept_df = existing_df[~existing_keys.isin(changed)]
+    combined = pd.concat([kept_df, new_df], ignore_index=True)
+    return combined.sort_values(by=key_columns, kind='stable').reset_index(drop=True)
@@ -0,0 +1,101 @@
+from itertools import islice
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Events and deaths of a Wikipedia day page: every <li> of the first <ul> after the
+# heading's block, as {'year', 'title', 'link'} built from the first two links of the item.
+
+EVENTS_ID = 'رویدادها'
+DEATHS_ID = 'درگذشت‌ها'
+SECTION_IDS = (EVENTS_ID, DEATHS_ID)
+
+
+def _item(year, title, link):
+    link = link if link else ''
+    # Convert relative URLs to absolute URLs
+    if link.startswith('/'):
+        link = 'https://fa.wikipedia.org' + link
+    return {'year': year, 'title': title, 'link': link}
+
+
+def _soup_section(soup, section_id):
+    items = []
+    h2 = soup.find('h2', id=section_id)
+    if h2:
+        next_ul = h2.parent.find_next_sibling('ul')
+        if next_ul:
+            for li in next_ul.find_all('li'):
+                links = li.find_all('a')
+                if len(links) >= 2:
+                    items.append(_item(links[0].get_text(strip=True), links[1].get_text(strip=True),
+                                       links[1].get('href')))
+    return items
+
+
+def parse_day_page_soup(html):
+    """(events, deaths) of a day page with BeautifulSoup's html.parser (slow reference path)"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return tuple(_soup_section(soup, section_id) for section_id in SECTION_IDS)
+
+
+# lxml objects are created once; parsing UTF-8 bytes is faster than parsing a str
+if etree is not None:
+    HTML_PARSER = etree.HTMLParser(encoding='utf-8')
+    FIND_HEADING = etree.XPath('//h2[@id=$section_id]')
+
+
+def _text(element):
+    # Same as BeautifulSoup's get_text(strip=True), with a shortcut for plain-text links
+    if len(element) == 0:
+        return element.text.strip() if element.text else ''
+    return ''.join(text.strip() for text in element.itertext())
+
+
+def _lxml_section(root, section_id):
+    # None when the heading or its list is not in the parsed document
+    headings = FIND_HEADING(root, section_id=section_id)
+    if not headings:
+        return None
+    next_ul = next(headings[0].getparent().itersiblings('ul'), None)
+    if next_ul is None:
+        return None
+    items = []
+    for li in next_ul.iter('li'):
+        # Only the first two links matter
+        links = list(islice(li.iter('a'), 2))
+        if len(links) == 2:
+            items.append(_item(_text(links[0]), _text(links[1]), links[1].get('href')))
+    return items
+
+
+def _section_window(html):
+    # From <body> up to the heading that follows the last needed section: skips the styles,
+    # scripts, references and navboxes that make up most of a page
+    positions = [html.find(f'id="{section_id}"') for section_id in SECTION_IDS]
+    if -1 in positions:
+        return None
+    end = html.find('<h2', max(positions))
+    start = html.find('<body')
+    return html[max(start, 0):end if end != -1 else len(html)]
+
+
+def parse_day_page_lxml(html):
+    """(events, deaths) of a day page with lxml, same result as parse_day_page_soup"""
+    window = _section_window(html)
+    if window is not None:
+        root = etree.fromstring(window.encode('utf-8'), HTML_PARSER)
+        sections = [_lxml_section(root, section_id) for section_id in SECTION_IDS]
+        if None not in sections:
+            return tuple(sections)
+    # Unusual layout (a heading or list outside the window): parse the whole page
+    root = etree.fromstring(html.encode('utf-8'), HTML_PARSER)
+    return tuple(_lxml_section(root, section_id) or [] for section_id in SECTION_IDS)
+
+
+# lxml is optional, without it the scraper falls back to html.parser
+parse_day_page = parse_day_page_lxml if etree is not None else parse_day_page_soup
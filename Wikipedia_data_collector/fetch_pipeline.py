@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Two-stage page pipeline: fetch threads do the network I/O and a process pool does the
+# GIL-bound parsing, so each stage can be sized on its own. At most `backlog` fetched pages
+# wait for (or are in) the parse stage; fetch threads block once it is full, so a slow
+# parser throttles fetching instead of piling pages up in memory.
+
+FETCH_WORKERS = int(os.environ.get('WIKI_FETCH_WORKERS', 10))
+PARSE_WORKERS = int(os.environ.get('WIKI_PARSE_WORKERS', os.cpu_count() or 1))
+
+
+def _process_context():
+    # Forking a process that already runs fetch threads can deadlock, start workers from a clean server
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return None
+
+
+def fetch_and_parse(items, fetch, parse, fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS, backlog=None):
+    """Yield (item, parse(fetch(item))) in completion order, skipping items whose fetch returned None
+
+    fetch runs in threads; parse runs in worker processes, so it must be a module-level function.
+    """
+    items = list(items)
+    slots = threading.BoundedSemaphore(backlog or 2 * parse_workers)
+    results = queue.Queue()
+
+    parsers = ProcessPoolExecutor(max_workers=parse_workers, mp_context=_process_context())
+    fetchers = ThreadPoolExecutor(max_workers=fetch_workers)
+
+    def fetch_one(item):
+        try:
+            page = fetch(item)
+        except Exception as e:
+            results.put((item, None, e))
+            return
+        if page is None:
+            results.put((item, None, None))
+            return
+        slots.acquire()
+
+        def parsed(future):
+            slots.release()
+            results.put((item, future, None))
+
+        try:
+            parsers.submit(parse, page).add_done_callback(parsed)
+        except Exception as e:
+            # e.g. a broken process pool: report it instead of leaving the consumer waiting
+            slots.release()
+            results.put((item, None, e))
+
+    try:
+        for item in items:
+            fetchers.submit(fetch_one, item)
+        for _ in range(len(items)):
+            item, future, error = results.get()
+            if error is not None:
+                raise error
+            if future is not None:
+                yield item, future.result()
+    finally:
+        fetchers.shutdown(wait=True, cancel_futures=True)
+        parsers.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,47 @@
+import hashlib
+import json
+import os
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+# Recorded responses are stored as one JSON file per request:
+#   <fixtures_dir>/<host>/<sha1 of the canonical request>.json
+
+
+def canonical_request(host, path, query_items):
+    # Host + decoded path + sorted query, so the recorder and the stand-in server agree on keys
+    query = urlencode(sorted((str(k), str(v)) for k, v in query_items))
+    return f"{host}{unquote(path)}?{query}"
+
+
+def request_key(url, params=None):
+    parts = urlsplit(url)
+    items = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        items += list(params.items())
+    return parts.netloc, canonical_request(parts.netloc, parts.path, items)
+
+
+def fixture_path(fixtures_dir, host, canonical):
+    digest = hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+    return os.path.join(fixtures_dir, host, digest + '.json')
+
+
+def save_fixture(fixtures_dir, url, params, status, headers, text):
+    host, canonical = request_key(url, params)
+    path = fixture_path(fixtures_dir, host, canonical)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'request': canonical,
+            'status': status,
+            'content_type': headers.get('Content-Type', 'text/plain'),
+            'body': text,
+        }, f, ensure_ascii=False)
+
+
+def load_fixture(fixtures_dir, host, canonical):
+    path = fixture_path(fixtures_dir, host, canonical)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
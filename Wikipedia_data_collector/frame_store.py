@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from person_link_resolver import parse_link_list
+
+# Typed Parquet files between the Data_Processing stages (Data_preprocessing.py ->
+# Converting_to_English.py -> category_finder.py -> merge_and_json_creator.py -> max_min_creator.py).
+#
+# Every dataset has an explicit schema of its known columns: dates are integers, link lists are
+# list<struct<text, url>> (read back as lists of {'text', 'url'} dicts, never parsed from strings)
+# and repeated labels are dictionary encoded (read back as categoricals). Columns that are not in
+# the schema keep the type pyarrow infers, so a stage can add columns without touching this file.
+#
+# read_frame() falls back to the CSV file of the same name when there is no Parquet file yet,
+# which is how the CSV outputs of the collectors and of older runs come in; their link lists are
+# parsed once there.
+
+# Persian and Arabic-Indic digits as ASCII digits
+ASCII_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+
+LINK = pa.struct([('text', pa.string()), ('url', pa.string())])
+LINKS = pa.list_(LINK)
+LABEL = pa.dictionary(pa.int16(), pa.string())
+
+DATE_COLUMNS = {
+    'year': pa.int32(), 'month': pa.int8(), 'day': pa.int8(),
+    'year_gregorian': pa.int32(), 'month_gregorian': pa.int8(), 'day_gregorian': pa.int8(),
+}
+PROVENANCE_COLUMNS = {'cluster_id': pa.int32(), 'source': LABEL, 'source_row': pa.int32(), 'sources': LABEL}
+
+EVENT_COLUMNS = {**DATE_COLUMNS, 'title': pa.string(), 'links': LINKS, **PROVENANCE_COLUMNS,
+                 'event_link': pa.string(), 'event_link_english': pa.string(), 'title_english': pa.string()}
+DEATH_COLUMNS = {**DATE_COLUMNS, 'person': pa.string(), 'details': pa.string(), 'link': LINKS,
+                 'person_link': pa.string(), **PROVENANCE_COLUMNS, 'person_link_english': pa.string(),
+                 'person_name_english': pa.string(), 'details_english': pa.string()}
+# Events and deaths in one table; month and day are zero padded text there and 'link' is a URL
+MERGED_COLUMNS = {'year': pa.int32(), 'year_gregorian': pa.int32(), 'title': pa.string(), 'links': LINKS,
+                  'link': pa.string(), 'link_english': pa.string(), 'title_english': pa.string(),
+                  'type': LABEL, 'era_persian': LABEL, 'era_english': LABEL, 'source': LABEL, 'sources': LABEL}
+
+
+def _integer_series(series, name):
+    # Years are digit strings (Persian, Arabic-Indic or ASCII) with stray spaces in some sources
+    text = series.map(lambda value: value.translate(ASCII_DIGITS).strip() if isinstance(value, str) else value)
+    numbers = pd.to_numeric(text, errors='coerce')
+    # Anything else ('544 پیش از هجرت', a place name in the year column) can only be written as null
+    lost = numbers.isna() & text.notna() & (text != '')
+    if lost.any():
+        examples = ', '.join(repr(value) for value in series[lost].astype(str).unique()[:5])
+        print(f"{lost.sum()} values of {name} are not numbers and are written as null, e.g. {examples}")
+    return numbers.astype('Int64')
+
+
+def _column_array(series, column_type):
+    if pa.types.is_list(column_type):
+        return pa.array([parse_link_list(value) for value in series], type=column_type)
+    if pa.types.is_integer(column_type):
+        series = _integer_series(series, series.name)
+        return pa.array(series, type=pa.int64(), from_pandas=True).cast(column_type)
+    if pa.types.is_dictionary(column_type):
+        return pa.array(series.astype(object), type=pa.string(), from_pandas=True).dictionary_encode()
+    return pa.array(series.astype(object), type=column_type, from_pandas=True)
+
+
+def frame_schema(df, columns):
+    """Schema of df: the types of `columns` for the columns it has, the pyarrow inferred type for the others"""
+    inferred = pa.Schema.from_pandas(df[[name for name in df.columns if name not in columns]], preserve_index=False)
+    return pa.schema([pa.field(name, columns[name] if name in columns else inferred.field(name).type)
+                      for name in df.columns])
+
+
+def write_frame(df, path, columns):
+    """Writes df to the Parquet file at path with the schema of `columns` (see frame_schema)"""
+    schema = frame_schema(df, columns)
+    arrays = [_column_array(df[field.name], field.type) if field.name in columns
+              else pa.array(df[field.name], type=field.type, from_pandas=True) for field in schema]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    pq.write_table(pa.Table.from_arrays(arrays, schema=schema), path)
+
+
+def read_frame(path, columns):
+    """The frame in the Parquet file at path, or in the CSV file of the same name when there is none"""
+    if os.path.exists(path):
+        table = pq.read_table(path)
+        df = table.to_pandas()
+        for name in table.column_names:
+            if pa.types.is_list(table.schema.field(name).type):
+                df[name] = table.column(name).to_pylist()
+        return df
+    df = pd.read_csv(os.path.splitext(path)[0] + '.csv')
+    for name, column_type in columns.items():
+        if name in df.columns and pa.types.is_list(column_type):
+            df[name] = [parse_link_list(value) for value in df[name]]
+    return df
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from persiantools.jdatetime import JalaliDate
+except ImportError:
+    JalaliDate = None
+
+# Jalali (solar hijri) to Gregorian conversion of whole year/month/day columns at once.
+#
+# The number of days from 1 Farvardin of year 1 to 1 Farvardin of every year is looked up in a
+# table built once from the leap years, and the month and day are added as offsets; numpy's
+# datetime64 then gives the Gregorian date. Leap years are taken from persiantools when it is
+# installed, so the results match JalaliDate(...).to_gregorian() (run this file to check every
+# date), and follow the 33-year rule otherwise.
+
+MIN_YEAR = 1
+MAX_YEAR = 9377
+# 1 Farvardin 1 in the proleptic Gregorian calendar
+EPOCH = np.datetime64('0622-03-22', 'D')
+# Days before every month; months 1-6 have 31 days, 7-11 have 30 and Esfand 29 (30 in leap years)
+MONTH_OFFSETS = np.array([0, 0, 31, 62, 93, 124, 155, 186, 216, 246, 276, 306, 336])
+MONTH_LENGTHS = np.array([0, 31, 31, 31, 31, 31, 31, 30, 30, 30, 30, 30, 29])
+
+
+def _leap_years():
+    years = np.arange(MIN_YEAR, MAX_YEAR + 1)
+    if JalaliDate is not None:
+        return np.array([JalaliDate.is_leap(int(year)) for year in years])
+    return (25 * years + 11) % 33 < 8
+
+
+LEAP = np.concatenate(([False], _leap_years()))
+# YEAR_STARTS[year] is the number of days from 1 Farvardin 1 to 1 Farvardin of year
+YEAR_STARTS = np.concatenate(([0, 0], np.cumsum(365 + LEAP[1:-1].astype(np.int64))))
+
+
+def jalali_to_gregorian(years, months, days):
+    """Gregorian (years, months, days, valid) arrays of Jalali dates.
+
+    Like the row by row conversion it replaces, a negative year counts as year 1 and day 0 as
+    the 1st of the month. Dates that do not exist (missing parts, month out of 1-12, day past the
+    end of its month, year 0 or after MAX_YEAR) are False in `valid` and 0 in the other arrays.
+    """
+    years = pd.to_numeric(pd.Series(years), errors='coerce').to_numpy(dtype=float)
+    months = pd.to_numeric(pd.Series(months), errors='coerce').to_numpy(dtype=float)
+    days = pd.to_numeric(pd.Series(days), errors='coerce').to_numpy(dtype=float)
+    years = np.where(years < 0, 1, years)
+    days = np.where(days == 0, 1, days)
+
+    whole = (years % 1 == 0) & (months % 1 == 0) & (days % 1 == 0)
+    valid = whole & (years >= MIN_YEAR) & (years <= MAX_YEAR) & (months >= 1) & (months <= 12) & (days >= 1)
+    year = np.where(valid, years, 1).astype(np.int64)
+    month = np.where(valid, months, 1).astype(np.int64)
+    day = np.where(valid, days, 1).astype(np.int64)
+    valid &= day <= MONTH_LENGTHS[month] + ((month == 12) & LEAP[year])
+
+    gregorian = EPOCH + (YEAR_STARTS[year] + MONTH_OFFSETS[month] + day - 1).astype('m8[D]')
+    month_starts = gregorian.astype('M8[M]')
+    return (np.where(valid, gregorian.astype('M8[Y]').astype(np.int64) + 1970, 0),
+            np.where(valid, month_starts.astype(np.int64) % 12 + 1, 0),
+            np.where(valid, (gregorian - month_starts).astype(np.int64) + 1, 0),
+            valid)
+
+
+def add_gregorian_columns(df):
+    """Adds year_gregorian, month_gregorian and day_gregorian to df (nulls for invalid dates); returns the valid mask"""
+    years, months, days, valid = jalali_to_gregorian(df['year'], df['month'], df['day'])
+    for name, values in (('year_gregorian', years), ('month_gregorian', months), ('day_gregorian', days)):
+        df[name] = pd.Series(values, index=df.index, dtype='Int64').mask(~valid)
+    return valid
+
+
+def check_against_persiantools():
+    """Converts every date of years MIN_YEAR to MAX_YEAR both ways and returns the number of differences"""
+    years, months, days = [], [], []
+    for month in range(1, 13):
+        for day in range(1, 32):
+            years.append(np.arange(MIN_YEAR, MAX_YEAR + 1))
+            months.append(np.full(MAX_YEAR, month))
+            days.append(np.full(MAX_YEAR, day))
+    years, months, days = np.concatenate(years), np.concatenate(months), np.concatenate(days)
+    g_years, g_months, g_days, valid = jalali_to_gregorian(years, months, days)
+
+    differences = 0
+    for i in range(len(years)):
+        try:
+            expected = JalaliDate(int(years[i]), int(months[i]), int(days[i])).to_gregorian()
+        except ValueError:
+            expected = None
+        actual = (int(g_years[i]), int(g_months[i]), int(g_days[i])) if valid[i] else None
+        if actual != (None if expected is None else (expected.year, expected.month, expected.day)):
+            differences += 1
+            if differences <= 10:
+                print(f"{years[i]}-{months[i]}-{days[i]}: persiantools {expected}, vectorized {actual}")
+    return differences
+
+
+if __name__ == '__main__':
+    if JalaliDate is None:
+        print("persiantools is not installed, nothing to check against")
+    else:
+        differences = check_against_persiantools()
+        print(f"{differences} dates differ from persiantools")
@@ -0,0 +1,49 @@
+import re
+
+import pandas as pd
+
+from translation_memory import ARABIC_TO_PERSIAN
+
+# Multi-label keyword classification of whole text columns.
+#
+# The keywords of every label are compiled once into a single alternation, and each label is one
+# vectorized str.contains pass over the column (RE2 on pyarrow strings, which stays linear in the
+# text however many keywords there are). Keywords match whole words with Persian boundaries:
+# Persian and Arabic letters are word characters, while Arabic punctuation (، ؛ ؟) and the
+# zero-width non-joiner (ZWNJ) end a word, so وزیر matches نخست‌وزیر and جنگ matches جنگ‌ها.
+# A space or ZWNJ inside a keyword matches a space, a ZWNJ or nothing, as Persian text writes
+# compounds all three ways (زمین لرزه, زمین‌لرزه, زمینلرزه). Diacritics such as the ezafe
+# hamza (سلسلهٔ) and Arabic letter variants are removed from texts and keywords alike.
+
+ZWNJ = '\u200c'
+# Latin and Persian/Arabic letters and digits
+WORD_CHARACTERS = 'A-Za-z0-9\u0621-\u064a\u0660-\u0669\u066e-\u06d3\u06d5\u06f0-\u06ff'
+NOT_WORD = f'[^{WORD_CHARACTERS}]'
+DIACRITICS = '[\u064b-\u065f\u0670]'
+
+
+def normalize_keyword_text(series):
+    # Persian letters for Arabic variants, no diacritics, lower case for Latin text
+    return series.str.translate(ARABIC_TO_PERSIAN).str.replace(DIACRITICS, '', regex=True).str.lower()
+
+
+def keyword_pattern(keywords):
+    """One pattern matching any of keywords as whole Persian words"""
+    alternatives = []
+    for keyword in dict.fromkeys(keywords):
+        keyword = re.sub(DIACRITICS, '', keyword.translate(ARABIC_TO_PERSIAN)).lower()
+        parts = re.split(f'[ {ZWNJ}]+', keyword.strip())
+        alternatives.append(f'[ {ZWNJ}]?'.join(re.escape(part) for part in parts))
+    return f'(?:^|{NOT_WORD})(?:{"|".join(alternatives)})(?:{NOT_WORD}|$)'
+
+
+def compile_labels(label_keywords):
+    """{label: pattern} for {label: [keywords]}"""
+    return {label: keyword_pattern(keywords) for label, keywords in label_keywords.items()}
+
+
+def classify(texts, label_patterns):
+    """Boolean label matrix: one row per text, one column per label, True where a keyword of the label occurs"""
+    texts = normalize_keyword_text(pd.Series(texts).astype('str'))
+    return pd.DataFrame({label: texts.str.contains(pattern, regex=True).fillna(False).astype(bool)
+                         for label, pattern in label_patterns.items()}, index=texts.index)
@@ -0,0 +1,81 @@
+from collections import deque
+
+# Link attribution: which of a page's links appear in a line of text.
+# Checking `link in line` for every link costs O(lines x links) substring searches per page;
+# the Aho-Corasick automaton below is built once per page and finds every link text
+# contained in a line with a single pass over the line.
+
+
+class LinkIndex:
+    """Aho-Corasick automaton over link texts, returning matches in the order the links were given"""
+
+    def __init__(self, links):
+        # links is {link text: url} (or any iterable of link texts)
+        self.links = links if isinstance(links, dict) else dict.fromkeys(links)
+        self.texts = list(self.links)
+        self._goto = [{}]
+        self._fail = [0]
+        # Pattern ids ending at each node, and the nearest proper suffix node that ends a pattern
+        self._ends = [[]]
+        self._next_end = [None]
+        self._always = []
+        for pattern_id, text in enumerate(self.texts):
+            if text == '':
+                # '' is in every string
+                self._always.append(pattern_id)
+            else:
+                self._add(pattern_id, text)
+        self._build_failure_links()
+
+    def _add(self, pattern_id, text):
+        node = 0
+        for char in text:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._ends.append([])
+                self._next_end.append(None)
+            node = child
+        self._ends[node].append(pattern_id)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                suffix = self._fail[child]
+                self._next_end[child] = suffix if self._ends[suffix] else self._next_end[suffix]
+                queue.append(child)
+
+    def find_ids(self, line):
+        """Sorted ids (positions in the link order) of every link text contained in line"""
+        goto, fail, ends, next_end = self._goto, self._fail, self._ends, self._next_end
+        found = set(self._always)
+        seen = set()
+        node = 0
+        for char in line:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            # Walk the chain of patterns ending here; a node already walked has reported its chain
+            end = node if ends[node] else next_end[node]
+            while end is not None and end not in seen:
+                seen.add(end)
+                found.update(ends[end])
+                end = next_end[end]
+        return sorted(found)
+
+    def find(self, line):
+        """Link texts contained in line"""
+        return [self.texts[i] for i in self.find_ids(line)]
+
+    def matches(self, line):
+        """[{'text', 'url'}] of the links contained in line, the format stored in the 'links' columns"""
+        return [{'text': text, 'url': self.links[text]} for text in self.find(line)]
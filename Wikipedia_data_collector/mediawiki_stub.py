@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import os
+import random
+
+from aiohttp import web
+
+from fixture_store import canonical_request, load_fixture
+
+# Local stand-in for Wikipedia that replays recorded fixtures.
+#
+# 1. Record real responses once (any collector works, they all use wiki_fetch):
+#      WIKI_RECORD_DIR=fixtures python Datacollectionwith_API.py
+# 2. Serve them:
+#      python mediawiki_stub.py --fixtures fixtures --latency 0.05 --error-rate 0.01
+# 3. Point the collectors at the stand-in:
+#      WIKI_BASE_URL=http://127.0.0.1:8080 python Datacollectionwith_API.py
+#
+# Requests arrive as /<original host>/<original path>?<query>, see wiki_fetch.rewrite_url.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_app(fixtures_dir, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+    rng = random.Random(seed)
+    stats = {'served': 0, 'missing': 0, 'errors': 0}
+
+    async def replay(request):
+        delay = latency + rng.uniform(0, jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if rng.random() < error_rate:
+            stats['errors'] += 1
+            return web.Response(status=503, headers={'Retry-After': '1'}, text='Service Unavailable')
+        host, _, path = request.path.lstrip('/').partition('/')
+        fixture = load_fixture(fixtures_dir, host, canonical_request(host, '/' + path, request.query.items()))
+        if fixture is None:
+            stats['missing'] += 1
+            return web.Response(status=404, text='No recorded fixture for this request')
+        stats['served'] += 1
+        content_type, _, charset = fixture['content_type'].partition(';')
+        return web.Response(status=fixture['status'], text=fixture['body'], content_type=content_type.strip(),
+                            charset=charset.partition('=')[2].strip() or 'utf-8')
+
+    async def show_stats(request):
+        return web.json_response(stats)
+
+    app = web.Application()
+    app['stats'] = stats
+    app.router.add_get('/_stats', show_stats)
+    app.router.add_get('/{tail:.*}', replay)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded Wikipedia responses locally")
+    parser.add_argument('--fixtures', default=os.path.join(script_dir, 'fixtures'))
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    app = make_app(args.fixtures, args.latency, args.jitter, args.error_rate, args.seed)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
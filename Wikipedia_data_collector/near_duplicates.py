@@ -0,0 +1,183 @@
+import re
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from translation_memory import normalize_text
+
+# Near-duplicate events (the same event worded a little differently, or scraped from both a
+# day page and a year page) grouped into clusters in roughly linear time.
+#
+# Every title is normalized and cut into overlapping character shingles. A MinHash signature
+# of NUM_PERM hashed shingles estimates how many shingles two titles share, and LSH cuts the
+# signatures into BANDS bands: titles that agree on a whole band land in the same bucket and
+# become candidate pairs, so titles are never compared with the whole dataset. A candidate pair
+# is a duplicate when
+#   - its dates agree: two dates known to the day are at most `tolerance_days` apart, and a date
+#     without a month or a day only matches dates whose known parts (the year, and the month
+#     and day where both have them) are equal, so a row of a whole year never matches a day,
+#   - the numbers in the two titles are the same (ثبت ملی ... شماره ثبت ۱ and ... شماره ثبت ۲
+#     are two events however alike the rest is),
+#   - one title only adds words to the other (تظاهرات ... در تاسوعا and ... در عاشورا each have
+#     a word the other lacks, so they are two events), and
+#   - the Jaccard similarity of the two shingle sets is at least `threshold`.
+# Rows are taken in row order and every row joins the cluster of the first earlier row it is a
+# duplicate of, as long as that row started its cluster: members are only ever compared with
+# the first row of their cluster, so clusters do not grow by chaining similar titles.
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 16
+SIMILARITY_THRESHOLD = 0.6
+# Duplicates scraped from different pages are often dated a day apart
+DATE_TOLERANCE_DAYS = 1
+SEED = 1
+# Largest prime below 2**32; shingle hashes are 32 bit, so a * x + b fits in 64 bits
+PRIME = 4294967291
+# Signature value of titles without shingles; permuted hashes are below PRIME
+EMPTY = np.iinfo(np.uint32).max
+# Signatures of this many titles are taken at once, to keep the (shingles x NUM_PERM) array small
+CHUNK_ROWS = 4096
+
+# Jalali months 1-6 have 31 days, 7-11 have 30 and Esfand 29 (30 in leap years)
+MONTH_STARTS = np.array([0, 31, 62, 93, 124, 155, 186, 216, 246, 276, 306, 336])
+MONTH_LENGTHS = np.array([31, 31, 31, 31, 31, 31, 30, 30, 30, 30, 30, 30])
+YEAR_DAYS = 365
+
+# Footnote marks, punctuation and zero-width characters; digits and letters are kept
+NOISE_PATTERN = re.compile('\\[[^\\]]*\\]|[^\\w\\s]|[\u200c\u200b_]')
+PERSIAN_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩', '01234567890123456789')
+NUMBER_PATTERN = re.compile('[0-9]+')
+
+
+def normalize_title(title):
+    if not isinstance(title, str):
+        return ''
+    title = normalize_text(title).translate(PERSIAN_DIGITS)
+    return re.sub(r'\s+', ' ', NOISE_PATTERN.sub(' ', title)).strip()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def date_parts(years, months, days):
+    """(year, month, day, first, last) arrays; unknown parts are 0 and first/last are the day numbers the date spans"""
+    years = pd.to_numeric(pd.Series(years), errors='coerce').to_numpy(dtype=float)
+    months = pd.to_numeric(pd.Series(months), errors='coerce').to_numpy(dtype=float)
+    days = pd.to_numeric(pd.Series(days), errors='coerce').to_numpy(dtype=float)
+    year = np.nan_to_num(years).astype(np.int64)
+    month = np.where((months >= 1) & (months <= 12), months, 0).astype(np.int64)
+    day = np.where((days >= 1) & (days <= 31), days, 0).astype(np.int64)
+
+    # An unknown day spans its month, an unknown month its year
+    year_start = year * YEAR_DAYS
+    month_start = year_start + MONTH_STARTS[np.maximum(month, 1) - 1]
+    first = np.where(month > 0, month_start, year_start)
+    last = np.where(month > 0, month_start + MONTH_LENGTHS[np.maximum(month, 1) - 1] - 1, year_start + YEAR_DAYS - 1)
+    exact = (month > 0) & (day > 0)
+    first = np.where(exact, month_start + day - 1, first)
+    last = np.where(exact, first, last)
+    return year, month, day, first, last
+
+
+def dates_agree(dates, row, other, tolerance_days):
+    year, month, day, first, _ = dates
+    if month[row] and day[row] and month[other] and day[other]:
+        return abs(first[row] - first[other]) <= tolerance_days
+    # A partial date matches on the parts both dates know, never on the range it spans
+    return (year[row] == year[other] and (not month[row] or not month[other] or month[row] == month[other])
+            and (not day[row] or not day[other] or day[row] == day[other]))
+
+
+def words_differ(title, other):
+    """True when each title has a word the other does not (written with or without its spaces)"""
+    def missing(a, b):
+        compact = b.replace(' ', '')
+        return any(len(word) > 1 and word not in compact for word in a.split())
+    return missing(title, other) and missing(other, title)
+
+
+def minhash_signatures(shingle_sets, num_perm=NUM_PERM, seed=SEED):
+    """(rows x num_perm) MinHash signatures; empty sets get all-max signatures that match nothing"""
+    # Every distinct shingle is hashed once, occurrences only look its hashes up
+    vocabulary = {}
+    ids = [[vocabulary.setdefault(s, len(vocabulary)) for s in shingle_set] for shingle_set in shingle_sets]
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, PRIME, size=num_perm, dtype=np.uint64)
+    shingle_hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in vocabulary), dtype=np.uint64,
+                                 count=len(vocabulary))
+    permuted = ((shingle_hashes[:, None] * a + b) % PRIME).astype(np.uint32)
+
+    signatures = np.full((len(shingle_sets), num_perm), EMPTY, dtype=np.uint32)
+    for start in range(0, len(ids), CHUNK_ROWS):
+        chunk = ids[start:start + CHUNK_ROWS]
+        sizes = np.fromiter((len(row) for row in chunk), dtype=np.int64, count=len(chunk))
+        filled = np.flatnonzero(sizes)
+        if not len(filled):
+            continue
+        flat = np.fromiter((i for row in chunk for i in row), dtype=np.int64, count=int(sizes.sum()))
+        offsets = np.concatenate(([0], np.cumsum(sizes[filled])[:-1]))
+        signatures[start + filled] = np.minimum.reduceat(permuted[flat], offsets, axis=0)
+    return signatures
+
+
+def lsh_buckets(signatures, bands=BANDS):
+    """Yields the row numbers of every bucket of two or more rows that agree on a whole band"""
+    rows_per_band = signatures.shape[1] // bands
+    filled = np.flatnonzero(signatures[:, 0] != EMPTY)
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[filled, band * rows_per_band:(band + 1) * rows_per_band])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows_per_band))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = counts[inverse.ravel()] > 1
+        if not shared.any():
+            continue
+        members = filled[shared]
+        bucket_ids = inverse.ravel()[shared]
+        order = np.argsort(bucket_ids, kind='stable')
+        members, bucket_ids = members[order], bucket_ids[order]
+        bounds = np.flatnonzero(np.diff(bucket_ids)) + 1
+        yield from np.split(members, bounds)
+
+
+def cluster_near_duplicates(titles, years, months, days, tolerance_days=DATE_TOLERANCE_DAYS,
+                            threshold=SIMILARITY_THRESHOLD):
+    """Cluster id of every row: rows of one cluster are near-duplicates of its first row, ids count up from 0 in row order"""
+    normalized = [normalize_title(title) for title in titles]
+    shingle_sets = [shingles(title) for title in normalized]
+    numbers = [sorted(NUMBER_PATTERN.findall(title)) for title in normalized]
+    dates = date_parts(years, months, days)
+    first, last = dates[3], dates[4]
+    signatures = minhash_signatures(shingle_sets)
+
+    # Earlier rows every row shares a bucket with and whose dates agree with it
+    candidates = {}
+    for bucket in lsh_buckets(signatures):
+        # Sweep the bucket by date, so only pairs within the tolerance are looked at
+        bucket = bucket[np.argsort(first[bucket], kind='stable')]
+        for i, row in enumerate(bucket):
+            reach = last[row] + tolerance_days
+            for other in bucket[i + 1:]:
+                if first[other] > reach:
+                    break
+                earlier, later = (row, other) if row < other else (other, row)
+                if dates_agree(dates, earlier, later, tolerance_days):
+                    candidates.setdefault(later, set()).add(earlier)
+
+    # Every row joins the first cluster whose first row it is a duplicate of
+    leaders = np.arange(len(shingle_sets))
+    for row in sorted(candidates):
+        a = shingle_sets[row]
+        for other in sorted(candidates[row]):
+            if leaders[other] != other or numbers[row] != numbers[other]:
+                continue
+            b = shingle_sets[other]
+            if len(a & b) >= threshold * len(a | b) and not words_differ(normalized[row], normalized[other]):
+                leaders[row] = other
+                break
+    return pd.factorize(leaders)[0]
@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+
+from wiki_api import fetch_latest_revid, fetch_page_content, title_from_url
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(script_dir, 'cache', 'pages.sqlite')
+
+# revalidate: check the latest revid and re-download only changed pages
+# cache_only: never touch the network, pages missing from the cache return None
+# refresh:    always re-download
+CACHE_MODES = ('revalidate', 'cache_only', 'refresh')
+CACHE_MODE = os.environ.get('WIKI_CACHE_MODE', 'revalidate')
+
+
+class PageCache:
+    """SQLite store of page text and links keyed by (language, title) and revision id"""
+
+    def __init__(self, path=CACHE_PATH, mode=CACHE_MODE):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}, expected one of {CACHE_MODES}")
+        self.mode = mode
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "lang TEXT, title TEXT, revid INTEGER, content BLOB, fetched_at REAL, "
+            "PRIMARY KEY (lang, title))"
+        )
+        self._db.commit()
+        self._db_lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def get(self, lang, title):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT revid, content FROM pages WHERE lang = ? AND title = ?", (lang, title)
+            ).fetchone()
+        if row is None:
+            return None
+        page = json.loads(zlib.decompress(row[1]).decode('utf-8'))
+        page['revid'] = row[0]
+        return page
+
+    def put(self, lang, title, page):
+        content = zlib.compress(json.dumps({'text': page['text'], 'links': page['links']},
+                                           ensure_ascii=False).encode('utf-8'))
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (lang, title, revid, content, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (lang, title, page.get('revid'), content, time.time()),
+            )
+            self._db.commit()
+
+    def get_page_content(self, url, lang='fa', latest_revid=None):
+        """Same result as wiki_api.fetch_page_content, served from the cache when it is current
+
+        Pass latest_revid when it is already known (e.g. from wiki_api.fetch_revids) to skip
+        the per-page revalidation request.
+        """
+        title = title_from_url(url)
+        key = (lang, title)
+        # Coalesce concurrent requests for the same page into one load
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result()
+        try:
+            page = self._load(url, lang, title, latest_revid)
+            future.set_result(page)
+            return page
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _load(self, url, lang, title, latest_revid=None):
+        cached = self.get(lang, title)
+        if self.mode == 'cache_only':
+            return cached
+        if cached is not None and self.mode == 'revalidate':
+            latest = latest_revid if latest_revid is not None else fetch_latest_revid(lang, title)
+            if latest is not None and latest == cached['revid']:
+                return cached
+        page = fetch_page_content(url, lang=lang)
+        if page is None:
+            # Missing or cut short pages are never cached; an older copy is better than nothing
+            if cached is not None:
+                print(f"Could not fetch {title}, using the cached revision {cached['revid']}")
+            return cached
+        self.put(lang, title, page)
+        return page
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    """Process-wide shared PageCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache()
+        return _cache
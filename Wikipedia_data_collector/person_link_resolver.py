@@ -0,0 +1,111 @@
+import ast
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+try:
+    from rapidfuzz.distance import Indel as _Indel
+except ImportError:
+    _Indel = None
+
+# Picks the Wikipedia link of the person a death row is about, among the links of its line.
+#
+# The 'link' column holds the repr of a list of {'text', 'url'} dicts; it is parsed with
+# ast.literal_eval (never eval) once per row. A link is the match when its text is the most
+# similar to the person's name (difflib's SequenceMatcher ratio), with a similarity above
+# MIN_SIMILARITY. Candidates are first checked against bounds from their length and shared
+# character bigrams, then, when rapidfuzz is installed, against 2 * longest common subsequence /
+# total length (rapidfuzz's Indel, in C). The matching blocks of SequenceMatcher are a common
+# subsequence, so its ratio is never above that bound: the bounds only reject links difflib
+# would not pick either, and the matches are the same with or without rapidfuzz.
+
+MIN_SIMILARITY = 0.8
+NGRAM = 2
+MATCH_WORKERS = int(os.environ.get('WIKI_PARSE_WORKERS', os.cpu_count() or 1))
+# Below this many rows, starting worker processes costs more than it saves
+PARALLEL_MIN_ROWS = 20000
+
+
+def parse_link_list(value):
+    """[{'text', 'url'}] from a 'link' column value; anything that is not such a list gives []"""
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str) or not value.startswith('['):
+        return []
+    try:
+        links = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return [link for link in links if isinstance(link, dict) and 'text' in link and 'url' in link]
+
+
+def similarity(a, b):
+    # 2 * characters in matching blocks / total length, from 0 to 1
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def subsequence_bound(a, b):
+    # 2 * longest common subsequence / total length, at least similarity(a, b) (1.0 without rapidfuzz)
+    total = len(a) + len(b)
+    if _Indel is None or total == 0:
+        return 1.0
+    # Same float division as SequenceMatcher.ratio, so equal counts give equal scores
+    return 2.0 * (_Indel.similarity(a, b) // 2) / total
+
+
+@lru_cache(maxsize=None)
+def ngram_counts(text):
+    return Counter(text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1))
+
+
+def could_match(person, link_text, min_similarity=MIN_SIMILARITY):
+    """False only when link_text cannot be more than min_similarity similar to person"""
+    total = len(person) + len(link_text)
+    if total == 0:
+        # Two empty strings are identical
+        return True
+    # The similarity is at most 2 * min(length) / total
+    if 2 * min(len(person), len(link_text)) <= min_similarity * total:
+        return False
+    # Every edit breaks at most NGRAM bigrams, and the similarity bounds the number of edits
+    edits = int((1 - min_similarity) * total + 1e-9)
+    needed = max(len(person), len(link_text)) - NGRAM + 1 - NGRAM * edits
+    if needed <= 0:
+        return True
+    shared = sum((ngram_counts(person) & ngram_counts(link_text)).values())
+    return shared >= needed
+
+
+def best_matching_url(person, links, min_similarity=MIN_SIMILARITY):
+    """URL of the link most similar to person, or None when no link is more than min_similarity similar"""
+    if not isinstance(person, str):
+        return None
+    best_url = None
+    best_score = min_similarity
+    for link in links:
+        text = link['text']
+        if not could_match(person, text, best_score) or subsequence_bound(person, text) <= best_score:
+            continue
+        score = similarity(person, text)
+        # The first of equally similar links wins
+        if score > best_score:
+            best_score = score
+            best_url = link['url']
+    return best_url
+
+
+def _resolve_chunk(rows):
+    return [best_matching_url(person, links) for person, links in rows]
+
+
+def resolve_person_links(persons, link_values, workers=MATCH_WORKERS):
+    """Best matching URL (or None) for every (person, 'link' column value) pair, in order"""
+    rows = [(person, parse_link_list(value)) for person, value in zip(persons, link_values)]
+    if workers <= 1 or len(rows) < PARALLEL_MIN_ROWS:
+        return _resolve_chunk(rows)
+    chunk_size = -(-len(rows) // (workers * 4))
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [url for chunk in executor.map(_resolve_chunk, chunks) for url in chunk]
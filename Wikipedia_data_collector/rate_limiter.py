@@ -0,0 +1,107 @@
+import threading
+import time
+
+# Starting request rate (requests per second) per host, and how far it may move
+DEFAULT_RATE = 20.0
+MIN_RATE = 0.5
+MAX_RATE = 100.0
+BURST = 10
+HOST_RATES = {
+    'translate.google.com': 5.0,
+}
+TRANSLATE_HOST = 'translate.google.com'
+
+# Multiplicative ramp up on every healthy response, halving on every throttle signal
+RAMP_UP = 1.02
+BACK_OFF = 0.5
+DEFAULT_RETRY_AFTER = 2.0
+
+
+class _HostState:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        # Tokens are accounted up to this time; it lies in the future while the host is paused
+        self.updated = time.monotonic()
+
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket that slows down on 429/503/maxlag and speeds up while healthy"""
+
+    def __init__(self, default_rate=DEFAULT_RATE, host_rates=None, min_rate=MIN_RATE,
+                 max_rate=MAX_RATE, burst=BURST):
+        self.default_rate = default_rate
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.host_rates.get(host, self.default_rate), self.burst)
+        return self._hosts[host]
+
+    def reserve(self, host):
+        """Take one token for host and return how many seconds the caller must wait before sending"""
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            if now > state.updated:
+                state.tokens = min(state.burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+            # Tokens may go negative: that debt is what later callers queue behind
+            state.tokens -= 1
+            wait = -state.tokens / state.rate if state.tokens < 0 else 0.0
+            return max(0.0, state.updated - now) + wait
+
+    def wait(self, host):
+        # Blocking version of reserve() for synchronous callers
+        delay = self.reserve(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    def success(self, host):
+        with self._lock:
+            state = self._state(host)
+            state.rate = min(self.max_rate, state.rate * RAMP_UP)
+
+    def throttle(self, host, retry_after=None):
+        """Record a throttle signal (429, 503, maxlag, or a failed call); retry_after is in seconds"""
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            # Concurrent failures during one pause count as a single signal
+            if state.updated <= now:
+                state.rate = max(self.min_rate, state.rate * BACK_OFF)
+            pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+            state.updated = max(state.updated, now + pause)
+            # Drop the burst allowance so requests resume one at a time
+            state.tokens = min(state.tokens, 0)
+
+    def rate(self, host):
+        with self._lock:
+            return self._state(host).rate
+
+
+def parse_retry_after(value):
+    # Retry-After is normally a number of seconds; anything else falls back to the default
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Process-wide shared AdaptiveRateLimiter"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveRateLimiter()
+        return _limiter
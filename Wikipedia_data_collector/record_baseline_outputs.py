@@ -0,0 +1,120 @@
+import argparse
+import ast
+import contextlib
+import os
+import subprocess
+import tempfile
+import textwrap
+
+from benchmark_parsers import (EXPECTED_DIR, frame_rows, load_html_pages, load_pages, load_scrapper2_rows,
+                               write_json)
+
+# Records the golden outputs of benchmark_parsers.py with the original parsers, as they were
+# before they were rewritten, so the golden rows do not come from the code they check:
+#   python record_baseline_outputs.py              # parsers of BASELINE_REVISION
+#   python record_baseline_outputs.py --rev HEAD~3
+#
+# The original parsers are plain scripts that fetch and write files when they run, so only
+# their parsing code is taken out of git and run here:
+#   year_pages / day_pages  parse_wikipedia_content() of the two API collectors
+#   day_html                the extraction in the page loop of scrapper.py
+#   scrapper2_cleaner       the whole Scarpper2_Cealner.py, run over the corpus rows in a temp dir
+#
+# Changes of the rewritten parsers that are on purpose are recorded on top of these rows
+# with: python benchmark_parsers.py --update
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+# The commit the parsers were rewritten from
+BASELINE_REVISION = 'bdfc0af'
+
+
+def git_source(rev, name):
+    path = os.path.relpath(os.path.join(script_dir, name), git_root())
+    return subprocess.run(['git', 'show', f'{rev}:{path}'], cwd=script_dir, check=True,
+                          capture_output=True).stdout.decode('utf-8')
+
+
+def git_root():
+    return subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=script_dir, check=True,
+                          capture_output=True, text=True).stdout.strip()
+
+
+def script_functions(source, name):
+    # The imports and functions of a script, without the code that runs at module level
+    tree = ast.parse(source)
+    tree.body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+    namespace = {'__file__': os.path.join(script_dir, name)}
+    exec(compile(tree, name, 'exec'), namespace)
+    return namespace
+
+
+def scrapper_parser(source):
+    # scrapper.py parses inside its fetch loop: from the BeautifulSoup call to the deaths
+    lines = source.split('\n')
+    start = next(i for i, line in enumerate(lines) if 'soup = BeautifulSoup' in line)
+    end = next(i for i, line in enumerate(lines) if 'Done with the deaths' in line)
+    body = textwrap.dedent('\n'.join(lines[start:end + 1]))
+    wrapper = ('from bs4 import BeautifulSoup\n'
+               'def parse(html):\n'
+               '    month, day = 0, 0\n'
+               '    events_dict, deaths_dict = {}, {}\n'
+               '    response = type("Response", (), {"text": html})\n'
+               + textwrap.indent(body, '    ') + '\n'
+               '    return events_dict[0][0], deaths_dict[0][0]\n')
+    namespace = {}
+    exec(compile(wrapper, 'scrapper.py', 'exec'), namespace)
+    return namespace['parse']
+
+
+def scrapper2_outputs(source, events_df, deaths_df):
+    # Scarpper2_Cealner.py reads events.csv and deaths.csv next to it and cleans them at module level
+    with tempfile.TemporaryDirectory() as work_dir:
+        events_df.to_csv(os.path.join(work_dir, 'events.csv'), index=False)
+        deaths_df.to_csv(os.path.join(work_dir, 'deaths.csv'), index=False)
+        namespace = {'__file__': os.path.join(work_dir, 'Scarpper2_Cealner.py'), '__name__': 'baseline'}
+        exec(compile(source, 'Scarpper2_Cealner.py', 'exec'), namespace)
+    return namespace['data_events'], namespace['data_deaths']
+
+
+def record(rev):
+    year_parse = script_functions(git_source(rev, 'Datacollectionwith_API.py'),
+                                  'Datacollectionwith_API.py')['parse_wikipedia_content']
+    day_parse = script_functions(git_source(rev, 'Datacollectionwith_API_from_calender.py'),
+                                 'Datacollectionwith_API_from_calender.py')['parse_wikipedia_content']
+    html_parse = scrapper_parser(git_source(rev, 'scrapper.py'))
+    cleaner_source = git_source(rev, 'Scarpper2_Cealner.py')
+
+    outputs = {}
+    # The original parsers print their progress
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        outputs['year_pages'] = {}
+        for name, page in load_pages('year').items():
+            events_df, deaths_df = year_parse(page)
+            outputs['year_pages'][name] = {'events': frame_rows(events_df), 'deaths': frame_rows(deaths_df)}
+        outputs['day_pages'] = {}
+        for name, page in load_pages('day').items():
+            events_df, deaths_df = day_parse(page)
+            outputs['day_pages'][name] = {'events': frame_rows(events_df), 'deaths': frame_rows(deaths_df)}
+        outputs['day_html'] = {}
+        for name, html in load_html_pages().items():
+            events, deaths = html_parse(html)
+            outputs['day_html'][name] = {'events': events, 'deaths': deaths}
+        events_df, deaths_df = scrapper2_outputs(cleaner_source, *load_scrapper2_rows()['scrapper2'])
+        outputs['scrapper2_cleaner'] = {'scrapper2': {'events': frame_rows(events_df), 'deaths': frame_rows(deaths_df)}}
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record the golden outputs with the original parsers")
+    parser.add_argument('--rev', default=BASELINE_REVISION, help="git revision to take the parsers from")
+    args = parser.parse_args()
+
+    for parser_name, outputs in record(args.rev).items():
+        write_json(os.path.join(EXPECTED_DIR, parser_name + '.json'), outputs)
+        rows = sum(len(section) for output in outputs.values() for section in output.values())
+        print(f"{parser_name}: {len(outputs)} pages, {rows} rows")
+    print(f"Golden outputs of the parsers at {args.rev} written to {EXPECTED_DIR}")
+
+
+if __name__ == '__main__':
+    main()
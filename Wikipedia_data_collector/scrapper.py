@@ -1,9 +1,9 @@
-import requests
 import time
-from bs4 import BeautifulSoup
 import pandas as pd
 import pickle
 import os
+from wiki_fetch import get_engine
+from day_page_parser import parse_day_page
 
 # The current script's directory
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -18,36 +18,25 @@ deaths_dict = {}
 
 print("Time window loaded")
 
-# Define headers to mimic a web browser
-headers = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-}
+# Fetch all the day pages concurrently through the shared connection pool
+urls = [calendar["Wiki_URL"][i] for i in range(0, 366)]
+print(f"Fetching {len(urls)} pages")
+start_time = time.time()
+pages = get_engine().map_text(urls)
+print(f"Pages fetched in {time.time() - start_time} seconds")
 
+start_time = time.time()
 for i in range(0, 366):
-    url = calendar["Wiki_URL"][i]
+    url = urls[i]
     month = calendar["Month"][i]
     day = calendar["Day"][i]
 
-    print(f"Fetching URL: {url}")
-    start_time = time.time()
-    
-    try:
-        # Add headers and a timeout to the request
-        response = requests.get(url, headers=headers, timeout=10)
-
-        # Check for successful response status
-        if response.status_code == 200:
-            print(f"Page fetched successfully in {time.time() - start_time} seconds")
-        else:
-            print(f"Unable to download the page. Status code: {response.status_code}")
-            continue
-
-    except requests.exceptions.RequestException as e:
-        # Catch any request-related errors (e.g., timeout, connection error)
-        print(f"An error occurred while fetching {url}: {e}")
+    if pages[i] is None:
+        print(f"Unable to download the page: {url}")
         continue
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+    # lxml fast path when it is installed, see day_page_parser.py and benchmark_day_parser.py
+    events, deaths = parse_day_page(pages[i])
 
     # Initialize nested dictionaries if they don't exist
     if month not in events_dict:
@@ -60,52 +49,11 @@ for i in range(0, 366):
     if day not in deaths_dict[month]:
         deaths_dict[month][day] = []
 
-    # Find the events
-    h2_events = soup.find('h2', id='رویدادها')
-    if h2_events:
-        parent_div = h2_events.parent
-        next_ul = parent_div.find_next_sibling('ul')
-        if next_ul:
-            events = next_ul.find_all('li')
-            for event in events:
-                links = event.find_all('a')
-                if len(links) >= 2:
-                    year = links[0].get_text(strip=True)
-                    title = links[1].get_text(strip=True)
-                    link = links[1].get('href') if links[1].get('href') else ''
-                    # Convert relative URLs to absolute URLs
-                    if link.startswith('/'):
-                        link = 'https://fa.wikipedia.org' + link
-                    events_dict[month][day].append({
-                        'year': year,
-                        'title': title,
-                        'link': link
-                    })
-
+    events_dict[month][day].extend(events)
     print("Done with events")
-
-    # Find the deaths
-    h2_deaths = soup.find('h2', id='درگذشت‌ها')
-    if h2_deaths:
-        parent_div = h2_deaths.parent
-        next_ul = parent_div.find_next_sibling('ul')
-        if next_ul:
-            deaths = next_ul.find_all('li')
-            for death in deaths:
-                death_links = death.find_all('a')
-                if len(death_links) >= 2:
-                    year = death_links[0].get_text(strip=True)
-                    title = death_links[1].get_text(strip=True)
-                    link = death_links[1].get('href') if death_links[1].get('href') else ''
-                    # Convert relative URLs to absolute URLs
-                    if link.startswith('/'):
-                        link = 'https://fa.wikipedia.org' + link
-                    deaths_dict[month][day].append({
-                        'year': year,
-                        'title': title,
-                        'link': link
-                    })
+    deaths_dict[month][day].extend(deaths)
     print("Done with the deaths")
+print(f"Pages parsed in {time.time() - start_time} seconds")
 
 
 # with open('events.pkl', 'wb') as f:
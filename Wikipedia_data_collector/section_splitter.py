@@ -0,0 +1,44 @@
+import re
+from collections import namedtuple
+
+# Section headings of the year and day pages. A heading is a line that is exactly one of
+# these aliases; 'other' headings only mark where the section before them ends.
+SECTION_ALIASES = {
+    'events': ('رویدادها', 'رویداد ها', 'رویدادهای داخلی'),
+    'births': ('زادروزها', 'زادروز ها', 'تولدها'),
+    'deaths': ('درگذشت‌ها', 'درگذشت ها', 'درگذشتگان', 'مرگ‌ها'),
+    'other': ('تعطیلات و مناسبت‌ها', 'جوایز نوبل', 'جستارهای وابسته', 'پانویس', 'منابع',
+              'یادداشت‌ها', 'پیوند به بیرون'),
+}
+# Headings starting with these are 'other' headings too (e.g. پدیده‌های طبیعی)
+OTHER_PREFIXES = ('پدیده‌های',)
+
+# alias: the heading line that matched; text[start:end] is the section body
+Section = namedtuple('Section', ['alias', 'start', 'end', 'text'])
+
+HEADING_KINDS = {alias: kind for kind, aliases in SECTION_ALIASES.items() for alias in aliases}
+# Every heading line of a page, found with one scan of the text (longest aliases first)
+HEADING_PATTERN = re.compile(
+    r'^[ \t]*(' + '|'.join(re.escape(alias) for alias in sorted(HEADING_KINDS, key=len, reverse=True))
+    + '|' + '|'.join(re.escape(prefix) + r'[^\n]*?' for prefix in OTHER_PREFIXES) + r')[ \t]*$',
+    re.MULTILINE,
+)
+
+
+def split_sections(text):
+    """{'events' | 'births' | 'deaths': Section} of a page text, from one pass over its heading lines
+
+    A section starts after the first heading of its kind and runs to the next heading of
+    another kind, so subsections such as رویدادهای داخلی stay inside the events section.
+    """
+    # (kind, alias, start of the heading line, start of the next line)
+    headings = [(HEADING_KINDS.get(match.group(1), 'other'), match.group(1), match.start(), min(match.end() + 1, len(text)))
+                for match in HEADING_PATTERN.finditer(text)]
+
+    sections = {}
+    for i, (kind, alias, _, body_start) in enumerate(headings):
+        if kind == 'other' or kind in sections:
+            continue
+        body_end = next((start for other, _, start, _ in headings[i + 1:] if other != kind), len(text))
+        sections[kind] = Section(alias, body_start, body_end, text[body_start:body_end])
+    return sections
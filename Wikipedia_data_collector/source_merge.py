@@ -0,0 +1,65 @@
+from urllib.parse import unquote
+
+import numpy as np
+import pandas as pd
+
+from near_duplicates import normalize_title
+
+# Merges the records of several sources (calendar day pages, year pages, ...) that describe the
+# same events or deaths into one row each.
+#
+# Every source gets its identity keys computed once: the near-duplicate cluster of an event
+# (near_duplicates.py), or the Wikipedia page of a dead person, and when there is none their
+# normalized name and year. The keys of all sources are hashed together in one pd.factorize
+# pass (a hash join of the sources) and every key keeps the row of the first source that has
+# it, with provenance columns:
+#   source      the source the kept row comes from
+#   source_row  the row number of the kept row in that source
+#   sources     every source that has the key, '|' separated, in source order
+
+WIKI_PREFIX = 'https://fa.wikipedia.org/wiki/'
+
+
+def year_digits(years):
+    # Years are numbers in some sources and digit strings with stray spaces in others
+    return pd.Series(years).astype(str).str.replace('[^0-9]', '', regex=True)
+
+
+def person_keys(persons, person_links, years):
+    """Identity key of every dead person: their page, or their normalized name and year when they have none"""
+    links = pd.Series(person_links)
+    has_link = links.notna() & (links.astype(str) != '')
+    # Links are percent-encoded in some sources and not in others
+    pages = links[has_link].astype(str).map(unquote).str.replace(WIKI_PREFIX, '', regex=False)
+    pages = pages.map(normalize_title).str.replace(' ', '', regex=False)
+    names = pd.Series([normalize_title(person) for person in persons], index=links.index)
+    keys = 'name:' + names + '|' + year_digits(years).to_numpy()
+    keys[has_link] = 'page:' + pages
+    return keys.to_numpy()
+
+
+def merge_sources(sources, keys):
+    """One row per key out of sources [(name, df)] in priority order, keys [array per source]; adds provenance columns"""
+    names = [name for name, _ in sources]
+    source_ids = np.concatenate([np.full(len(df), i) for i, (_, df) in enumerate(sources)])
+    source_rows = np.concatenate([np.arange(len(df)) for _, df in sources])
+    codes, uniques = pd.factorize(np.concatenate([np.asarray(key, dtype=object) for key in keys]))
+
+    # Which sources have every key, as a bit per source
+    seen_in = np.zeros(len(uniques), dtype=np.int64)
+    np.bitwise_or.at(seen_in, codes, 1 << source_ids)
+    masks, mask_codes = np.unique(seen_in, return_inverse=True)
+    labels = np.array(['|'.join(name for i, name in enumerate(names) if mask >> i & 1) for mask in masks],
+                      dtype=object)
+
+    # Rows come in source order, so the first row of a key is the one of its first source
+    first = np.flatnonzero(~pd.Series(codes).duplicated().to_numpy())
+    frames = []
+    for i, (name, df) in enumerate(sources):
+        kept = first[source_ids[first] == i]
+        frame = df.iloc[source_rows[kept]].copy()
+        frame['source'] = name
+        frame['source_row'] = source_rows[kept]
+        frame['sources'] = labels[mask_codes[codes[kept]]]
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
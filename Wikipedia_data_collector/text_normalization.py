@@ -0,0 +1,104 @@
+import re
+
+import pandas as pd
+
+# Persian text cleanup shared by the collectors and the cleaning scripts.
+# Everything that runs over a whole column takes a pandas Series and uses the vectorized
+# .str methods with the precompiled patterns below, instead of a Python function per row.
+
+PERSIAN_MONTHS = {
+    'فروردین': 1, 'اردیبهشت': 2, 'خرداد': 3,
+    'تیر': 4, 'مرداد': 5, 'شهریور': 6,
+    'مهر': 7, 'آبان': 8, 'آذر': 9,
+    'دی': 10, 'بهمن': 11, 'اسفند': 12,
+}
+PERSIAN_TO_ENGLISH_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹', '0123456789')
+
+# Patterns avoid lookarounds and spell digit classes out, so they behave the same whether
+# pandas runs them with Python's re or with the regex engine of pyarrow strings.
+DIGITS = '[0-9۰-۹]'
+# Persian letters; the tatweel (ـ) that stretches a word out is not one, so مهرـ is a month name
+NOT_LETTER = '[^\u0622-\u063f\u0641-\u06cc]'
+# Longest names first, so a month is never cut short by one of its prefixes
+MONTH_ALTERNATION = '|'.join(sorted(PERSIAN_MONTHS, key=len, reverse=True))
+# ' مهر' anywhere in an event line, as removed by the year page parser
+SPACED_MONTH_RE = re.compile(rf' (?:{MONTH_ALTERNATION})')
+# The first digits written before a month name: '12 مهر' -> 12, '۶ تا ۹ آذر' -> 6
+DAY_BEFORE_MONTH_PATTERN = rf'({DIGITS}+).*?(?:{MONTH_ALTERNATION})(?:{NOT_LETTER}|$)'
+# Everything up to and including the last month name of a title, the name as a word of its own
+# (دی but not the دی of آزادی); the character after it is captured, so it can be put back
+UP_TO_LAST_MONTH_PATTERN = rf'^.*(?:^|{NOT_LETTER})(?:{MONTH_ALTERNATION})({NOT_LETTER}|$)'
+# A "12 مهر" line of a year page, which is a day heading rather than an event
+DAY_MONTH_HEADING_PATTERN = rf'^({DIGITS}+)\s+[آ-ی]+$'
+# 'زاد ...' / 'زادهٔ ...' birth note at the end of a death title (not the زاد of آزادی)
+BIRTH_NOTE_PATTERN = '(?:^|[^آ-ی])زاد.*$'
+# Whitespace, no-break spaces, ZWNJ and ZWS
+SPACES_PATTERN = '[\\s\u00a0\u202f\u200c\u200b]+'
+TITLE_PUNCTUATION = " ,،-*"
+
+
+def convert_persian_digits_to_english(text):
+    return text.translate(PERSIAN_TO_ENGLISH_DIGITS)
+
+
+def persian_digits_to_english(series):
+    # Missing values stay missing
+    return series.str.translate(PERSIAN_TO_ENGLISH_DIGITS)
+
+
+def persian_digits_only(series):
+    """Only the Persian digits of every value, as English digits ('سال ۱۳۲۰' -> '1320')"""
+    return series.astype(str).str.replace('[^\u06F0-\u06F9]', '', regex=True).str.translate(PERSIAN_TO_ENGLISH_DIGITS)
+
+
+def remove_month_names(line):
+    return SPACED_MONTH_RE.sub('', line)
+
+
+def normalize_spaces(series):
+    # ZWNJ and ZWS count as spaces; every run of them becomes one space
+    return series.str.replace(SPACES_PATTERN, ' ', regex=True).str.strip()
+
+
+def extract_day(series):
+    """Day written before the month name of every title, as a nullable integer"""
+    day = persian_digits_to_english(series.str.extract(DAY_BEFORE_MONTH_PATTERN, expand=False))
+    return pd.to_numeric(day, errors='coerce').astype('Int64')
+
+
+def strip_date_prefix(series):
+    # Drop the date the title starts with: everything up to the last month name
+    return series.str.replace(UP_TO_LAST_MONTH_PATTERN, r'\1', regex=True).str.strip(TITLE_PUNCTUATION)
+
+
+def clean_title_events(series):
+    return strip_date_prefix(normalize_spaces(series))
+
+
+def clean_title_deaths(series):
+    """(person, details) Series of death titles: the date and birth note are removed and the rest is split at the first ،"""
+    titles = strip_date_prefix(normalize_spaces(series))
+    has_birth = titles.str.contains(BIRTH_NOTE_PATTERN, regex=True, na=False)
+    titles = titles.where(~has_birth, titles.str.replace(BIRTH_NOTE_PATTERN, '', regex=True).str.strip(TITLE_PUNCTUATION + '()'))
+    person = titles.str.replace('،.*$', '', regex=True).str.strip(TITLE_PUNCTUATION)
+    details = titles.str.replace('^[^،]*،?', '', regex=True).str.strip(TITLE_PUNCTUATION)
+    return person, details
+
+
+def remove_brackets(series):
+    # Footnote markers and other [...] parts
+    return series.str.replace(r'\[.*?\]', '', regex=True).str.strip()
+
+
+def merge_day_month_rows(events_df):
+    # A "12 مهر" line is a heading for the events below it: give its day to the next two rows and drop it
+    if events_df.empty:
+        return events_df
+    heading_day = events_df['title'].str.extract(DAY_MONTH_HEADING_PATTERN, expand=False)
+    is_heading = heading_day.notna()
+    heading_day = pd.to_numeric(persian_digits_to_english(heading_day))
+    # The nearer heading wins when both of the two rows above are headings
+    day = heading_day.shift(1).fillna(heading_day.shift(2))
+    events_df = events_df.copy()
+    events_df['day'] = day.fillna(events_df['day']).astype(events_df['day'].dtype)
+    return events_df[~is_heading].reset_index(drop=True)
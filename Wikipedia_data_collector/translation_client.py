@@ -0,0 +1,133 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from rate_limiter import get_limiter, TRANSLATE_HOST
+
+# Google Translate rejects requests over 5000 characters; stay below with some margin
+MAX_CHARS = 4500
+MAX_SEGMENTS = 100
+MAX_RETRIES = 3
+# Segments are sent one per line; translations keep line breaks, and a batch whose
+# line count does not come back intact is split in two and retried
+DELIMITER = '\n'
+
+
+def pack_segments(texts, max_chars=MAX_CHARS, max_segments=MAX_SEGMENTS):
+    """Group texts into batches whose joined length stays under max_chars"""
+    batches, batch, size = [], [], 0
+    for text in texts:
+        extra = len(text) + (len(DELIMITER) if batch else 0)
+        if batch and (size + extra > max_chars or len(batch) >= max_segments):
+            batches.append(batch)
+            batch, size, extra = [], 0, len(text)
+        batch.append(text)
+        size += extra
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class AdaptiveConcurrency:
+    """Caps requests in flight: one more slot after `window` successes in a row, half as many after an error"""
+
+    def __init__(self, initial=4, minimum=1, maximum=10, window=5):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = window
+        self._active = 0
+        self._streak = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def release(self, ok):
+        with self._condition:
+            self._active -= 1
+            if ok:
+                self._streak += 1
+                if self._streak >= self.window:
+                    self.limit = min(self.maximum, self.limit + 1)
+                    self._streak = 0
+            else:
+                self.limit = max(self.minimum, self.limit // 2)
+                self._streak = 0
+            self._condition.notify_all()
+
+
+class PackedTranslator:
+    """Translates many short texts with few requests: packed batches, one translator per worker thread
+
+    make_translate() must return a function text -> translated text; it is called once per
+    worker thread, so client objects are never shared between threads.
+    """
+
+    def __init__(self, make_translate, max_chars=MAX_CHARS, max_segments=MAX_SEGMENTS,
+                 max_workers=10, host=TRANSLATE_HOST):
+        self.make_translate = make_translate
+        self.max_chars = max_chars
+        self.max_segments = max_segments
+        self.max_workers = max_workers
+        self.host = host
+        self.limiter = get_limiter()
+        self.concurrency = AdaptiveConcurrency(maximum=max_workers)
+        self._local = threading.local()
+        self._requests_lock = threading.Lock()
+        self.requests = 0
+
+    def _translate(self):
+        if not hasattr(self._local, 'translate'):
+            self._local.translate = self.make_translate()
+        return self._local.translate
+
+    def _request(self, text):
+        # One round trip, paced by the shared limiter and the concurrency cap
+        self.limiter.wait(self.host)
+        self.concurrency.acquire()
+        ok = False
+        try:
+            with self._requests_lock:
+                self.requests += 1
+            result = self._translate()(text)
+            ok = True
+            return result
+        finally:
+            self.concurrency.release(ok)
+            if ok:
+                self.limiter.success(self.host)
+            else:
+                self.limiter.throttle(self.host)
+
+    def _translate_batch(self, batch):
+        for attempt in range(MAX_RETRIES):
+            try:
+                result = self._request(DELIMITER.join(batch))
+                break
+            except Exception as e:
+                if attempt == MAX_RETRIES - 1:
+                    if len(batch) == 1:
+                        print(f"Failed to translate {batch[0][:50]}: {e}")
+                        return [None]
+                    result = None
+        parts = [part.strip() for part in result.split(DELIMITER)] if result else []
+        if len(parts) == len(batch):
+            return parts
+        if len(batch) == 1:
+            return [result.strip() if result else None]
+        # Lines were merged or dropped: split the batch and try the halves
+        middle = len(batch) // 2
+        return self._translate_batch(batch[:middle]) + self._translate_batch(batch[middle:])
+
+    def translate_all(self, texts):
+        """Translations of texts in order, None where a text could not be translated"""
+        # Line breaks inside a text would break the packing
+        texts = [' '.join(text.split()) for text in texts]
+        batches = pack_segments(texts, self.max_chars, self.max_segments)
+        print(f"Translating {len(texts)} texts in {len(batches)} packed requests")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._translate_batch, batches))
+        return [translation for batch in results for translation in batch]
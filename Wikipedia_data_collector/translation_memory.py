@@ -0,0 +1,117 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from translation_client import PackedTranslator
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+MEMORY_PATH = os.path.join(script_dir, 'cache', 'translations.sqlite')
+
+# Converting_to_English.py (googletrans) and 04_translate_titles.py (deep_translator) are two
+# clients of the same Google Translate service, so they share the 'google' engine key
+GOOGLE = 'google'
+
+# Arabic letter variants that show up in Persian text, folded only for the lookup key
+ARABIC_TO_PERSIAN = str.maketrans({'ي': 'ی', 'ى': 'ی', 'ك': 'ک'})
+
+
+def normalize_text(text):
+    # Unicode NFC, Persian letters, single spaces; zero-width non-joiners are kept
+    text = unicodedata.normalize('NFC', text).translate(ARABIC_TO_PERSIAN)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TranslationMemory:
+    """SQLite store of translations keyed by normalized source text, language pair and engine"""
+
+    def __init__(self, path=MEMORY_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "source TEXT, src TEXT, dest TEXT, engine TEXT, translation TEXT, translated_at REAL, "
+            "PRIMARY KEY (source, src, dest, engine))"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def get(self, text, src, dest, engine):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT translation FROM translations WHERE source = ? AND src = ? AND dest = ? AND engine = ?",
+                (normalize_text(text), src, dest, engine),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, text, src, dest, engine, translation):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations (source, src, dest, engine, translation, translated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_text(text), src, dest, engine, translation, time.time()),
+            )
+            self._db.commit()
+
+    def translate(self, text, translate, src, dest, engine):
+        """Translation of text from the memory, or translate(text) stored for next time
+
+        translate must raise on failure, so that errors are never remembered.
+        """
+        translation = self.get(text, src, dest, engine)
+        if translation is None:
+            translation = translate(text)
+            self.put(text, src, dest, engine, translation)
+        return translation
+
+    def translate_all(self, texts, translate, src, dest, engine, max_workers=1):
+        """Translations of texts in order: each distinct text is translated at most once
+
+        translate is a function text -> translation (run on max_workers threads) or a
+        PackedTranslator, which sends the missing texts in packed batches. Texts that are not
+        strings (e.g. NaN) are returned unchanged, failed translations as None.
+        """
+        keys = {}
+        for text in texts:
+            if isinstance(text, str) and text.strip():
+                keys.setdefault(normalize_text(text), text)
+        translations = {key: self.get(text, src, dest, engine) for key, text in keys.items()}
+        missing = [key for key, translation in translations.items() if translation is None]
+        print(f"{len(keys)} distinct texts, {len(keys) - len(missing)} already in the translation memory")
+
+        if isinstance(translate, PackedTranslator):
+            for key, translation in zip(missing, translate.translate_all([keys[key] for key in missing])):
+                if translation is not None:
+                    translations[key] = translation
+                    self.put(keys[key], src, dest, engine, translation)
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(translate, keys[key]): key for key in missing}
+                for done, future in enumerate(as_completed(futures), 1):
+                    key = futures[future]
+                    try:
+                        translations[key] = future.result()
+                        self.put(keys[key], src, dest, engine, translations[key])
+                    except Exception as e:
+                        print(f"Failed to translate {keys[key][:50]}: {e}")
+                    if done % 100 == 0:
+                        print(f"Translated {done}/{len(missing)}")
+
+        return [translations.get(normalize_text(text)) if isinstance(text, str) and text.strip() else text
+                for text in texts]
+
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """Process-wide shared TranslationMemory"""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = TranslationMemory()
+        return _memory
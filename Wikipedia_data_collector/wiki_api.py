@@ -0,0 +1,265 @@
+import re
+from urllib.parse import unquote, urlsplit
+
+from wiki_fetch import get_engine
+
+# Section headings in an explaintext extract, as matched by wikipediaapi
+SECTION_RE = re.compile(r"\n\n *(==+) (.*?) (==+) *\n")
+
+
+def api_url(lang):
+    return f"https://{lang}.wikipedia.org/w/api.php"
+
+
+def title_from_url(url):
+    return unquote(url.split("/wiki/")[-1]).replace('_', ' ')
+
+
+def lang_from_url(url):
+    host = urlsplit(url).netloc
+    if host.endswith('wikipedia.org'):
+        return host.split('.')[0]
+    return None
+
+
+# Ask the API to refuse requests while its replicas lag; the engine then backs off
+MAXLAG = 5
+
+
+def query_params(params):
+    return {'action': 'query', 'format': 'json', 'maxlag': MAXLAG, **params}
+
+
+def query(lang, params):
+    return get_engine().get_json(api_url(lang), query_params(params))
+
+
+def query_continued(lang, params):
+    # Follow the API 'continue' tokens and yield every response; when a request fails the
+    # result is incomplete, which is reported by yielding None as the last item
+    params = dict(params)
+    while True:
+        data = query(lang, params)
+        yield data
+        if data is None:
+            return
+        if 'continue' not in data:
+            return
+        params.update(data['continue'])
+
+
+# The MediaWiki API accepts up to 50 titles per query
+MAX_TITLES = 50
+
+
+def chunked(items, size=MAX_TITLES):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def query_titles(lang, params, titles):
+    """Run one query per 50 titles (all batches concurrently) and return every response
+
+    A batch whose request fails is reported and left out, so its titles are missing from the responses.
+    """
+    chunks = chunked(list(titles))
+    batches = [dict(params, titles='|'.join(chunk)) for chunk in chunks]
+    responses = get_engine().map_json([(api_url(lang), query_params(batch)) for batch in batches])
+    results = []
+    for chunk, batch, data in zip(chunks, batches, responses):
+        batch_results = []
+        # Rare, but a batch can still need continuation requests
+        while data is not None:
+            batch_results.append(data)
+            if 'continue' not in data:
+                break
+            batch = dict(batch, **data['continue'])
+            data = query(lang, batch)
+        if data is None:
+            # Part of the batch's pages (or of their properties) would be missing
+            print(f"Could not fetch {len(chunk)} titles from {lang}.wikipedia.org: {', '.join(chunk)}")
+            continue
+        results.extend(batch_results)
+    return results
+
+
+def resolve_title(title, normalized, redirects):
+    title = normalized.get(title, title)
+    return redirects.get(title, title)
+
+
+def collect_pages(responses):
+    # Merge the pages of several responses, keyed by final title, plus the title mappings
+    pages, normalized, redirects = {}, {}, {}
+    for data in responses:
+        q = data.get('query', {})
+        normalized.update({n['from']: n['to'] for n in q.get('normalized', [])})
+        redirects.update({r['from']: r['to'] for r in q.get('redirects', [])})
+        for page in q.get('pages', {}).values():
+            merged = pages.setdefault(page['title'], {})
+            for key, value in page.items():
+                # Continued responses carry the next part of list and dict properties (langlinks, pageviews)
+                if isinstance(value, list) and isinstance(merged.get(key), list):
+                    merged[key].extend(value)
+                elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+                    merged[key].update(value)
+                else:
+                    merged[key] = value
+    return pages, normalized, redirects
+
+
+def first_page(data):
+    pages = data.get('query', {}).get('pages', {}) if data else {}
+    for page in pages.values():
+        return page
+    return None
+
+
+def build_page_text(extract):
+    # Same layout as wikipediaapi's page.text: summary, then "title\ntext\n\n" per section
+    matches = list(SECTION_RE.finditer(extract))
+    if not matches:
+        return extract.strip()
+    summary = extract[:matches[0].start()].strip()
+    if summary == "":
+        summary = extract.strip()
+    text = summary + "\n\n" if summary else ""
+    for i, match in enumerate(matches):
+        if i + 1 < len(matches):
+            body = extract[match.end():matches[i + 1].start()].strip()
+        else:
+            body = extract[match.end():]
+        text += match.group(2).strip() + "\n" + body
+        if body:
+            text += "\n\n"
+    return text.strip()
+
+
+def fetch_page_links(lang, title):
+    """{link title: url} of the existing pages linked from a page, or None if a request failed"""
+    # generator=links + prop=info returns every linked page with its url and a 'missing'
+    # flag for red links, so existence is resolved 500 links per request instead of one by one
+    pages = []
+    params = {'generator': 'links', 'gpllimit': 'max', 'prop': 'info', 'inprop': 'url', 'titles': title}
+    for data in query_continued(lang, params):
+        # Part of the links would be missing
+        if data is None:
+            return None
+        pages.extend(data.get('query', {}).get('pages', {}).values())
+    # Keep the order of prop=links (namespace, then title)
+    pages.sort(key=lambda page: (page.get('ns', 0), page['title'].replace(' ', '_')))
+    return {page['title']: page['fullurl'] for page in pages
+            if 'missing' not in page and 'invalid' not in page}
+
+
+def fetch_page_content(url, lang='fa'):
+    """Page text, {link text: url} and revision id of an article, or None if it does not exist or could not be fetched completely"""
+    title = title_from_url(url)
+    data = query(lang, {'prop': 'extracts|info', 'explaintext': 1, 'exsectionformat': 'wiki', 'titles': title})
+    page = first_page(data)
+    if page is None or 'missing' in page or 'invalid' in page:
+        return None
+    links = fetch_page_links(lang, title)
+    if links is None:
+        print(f"Could not fetch every link of {title}")
+        return None
+    return {
+        'text': build_page_text(page.get('extract', '')),
+        'links': links,
+        'revid': page.get('lastrevid'),
+    }
+
+
+def fetch_revids(lang, titles):
+    """{title: latest revision id} for many pages, 50 titles per request (missing pages map to None)"""
+    titles = sorted(set(titles))
+    pages, normalized, redirects = collect_pages(query_titles(lang, {'prop': 'info'}, titles))
+    revids = {}
+    for title in titles:
+        page = pages.get(resolve_title(title, normalized, redirects), {})
+        revids[title] = page.get('lastrevid')
+    return revids
+
+
+def fetch_latest_revid(lang, title):
+    """Latest revision id of a page (None if it does not exist)"""
+    page = first_page(query(lang, {'prop': 'info', 'titles': title}))
+    if page is None or 'missing' in page or 'invalid' in page:
+        return None
+    return page.get('lastrevid')
+
+
+def fetch_thumbnails(urls, size=500):
+    """{url: thumbnail url} for Wikipedia article urls, resolved 50 titles per request"""
+    by_lang = {}
+    for url in set(urls):
+        lang = lang_from_url(url) if isinstance(url, str) and '/wiki/' in url else None
+        if lang is not None:
+            by_lang.setdefault(lang, {})[url] = title_from_url(url)
+    thumbnails = {}
+    for lang, titles in by_lang.items():
+        unique_titles = sorted(set(titles.values()))
+        responses = query_titles(lang, {'prop': 'pageimages', 'pithumbsize': size, 'pilimit': MAX_TITLES,
+                                        'redirects': 1}, unique_titles)
+        pages, normalized, redirects = collect_pages(responses)
+        for url, title in titles.items():
+            page = pages.get(resolve_title(title, normalized, redirects), {})
+            if 'thumbnail' in page:
+                thumbnails[url] = page['thumbnail']['source']
+    return thumbnails
+
+
+# Longest window the pageviews API allows
+PAGEVIEW_DAYS = 60
+
+
+def fetch_page_signals(urls, pageview_days=PAGEVIEW_DAYS):
+    """{url: {'page_length', 'langlink_count', 'pageviews'}} for Wikipedia article urls, 50 titles per request
+
+    page_length is the size of the wikitext in bytes and pageviews the total of the last pageview_days days.
+    Pages that do not exist get zeros; urls whose request failed are left out.
+    """
+    by_lang = {}
+    for url in set(urls):
+        lang = lang_from_url(url) if isinstance(url, str) and '/wiki/' in url else None
+        if lang is not None:
+            by_lang.setdefault(lang, {})[url] = title_from_url(url)
+    signals = {}
+    for lang, titles in by_lang.items():
+        responses = query_titles(lang, {'prop': 'info|langlinks|pageviews', 'lllimit': 'max',
+                                        'pvipdays': pageview_days, 'redirects': 1}, sorted(set(titles.values())))
+        pages, normalized, redirects = collect_pages(responses)
+        for url, title in titles.items():
+            page = pages.get(resolve_title(title, normalized, redirects))
+            if page is None:
+                continue
+            if 'missing' in page or 'invalid' in page:
+                signals[url] = {'page_length': 0, 'langlink_count': 0, 'pageviews': 0}
+                continue
+            signals[url] = {
+                'page_length': page.get('length', 0),
+                'langlink_count': len(page.get('langlinks', [])),
+                # Days without data come back as null
+                'pageviews': sum(views for views in (page.get('pageviews') or {}).values() if views),
+            }
+    return signals
+
+
+def fetch_langlinks(lang, title):
+    """{language: url} of a page's interlanguage links, or None if the page does not exist or a request failed"""
+    langlinks = {}
+    for data in query_continued(lang, {'prop': 'langlinks', 'llprop': 'url', 'lllimit': 'max', 'titles': title}):
+        if data is None:
+            return None
+        page = first_page(data)
+        if page is None or 'missing' in page or 'invalid' in page:
+            return None
+        langlinks.update({link['lang']: link['url'] for link in page.get('langlinks', [])})
+    return langlinks
+
+
+def fetch_page_title(lang, title):
+    """Canonical title of a page, or None if it does not exist"""
+    page = first_page(query(lang, {'prop': 'info', 'titles': title}))
+    if page is None or 'missing' in page or 'invalid' in page:
+        return None
+    return page['title']
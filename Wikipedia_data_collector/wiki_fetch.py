@@ -0,0 +1,178 @@
+import asyncio
+import atexit
+import json
+import os
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+from fixture_store import save_fixture
+from rate_limiter import get_limiter, parse_retry_after
+
+# One User-Agent for every request we send to Wikipedia (and anything else)
+USER_AGENT = "Iranian Timeline asghariali9877@gmail.com"
+
+# Connection pool settings shared by all collectors
+MAX_CONNECTIONS = 64
+PER_HOST_LIMIT = int(os.environ.get('WIKI_PER_HOST_LIMIT', 10))
+# Per-host overrides of PER_HOST_LIMIT, e.g. {'fa.wikipedia.org': 20}
+HOST_LIMITS = {}
+TIMEOUT = 30
+MAX_RETRIES = 4
+
+# WIKI_BASE_URL sends every request to a stand-in server (see mediawiki_stub.py) instead of
+# the real host; WIKI_RECORD_DIR saves every response as a replayable fixture
+BASE_URL = os.environ.get('WIKI_BASE_URL')
+RECORD_DIR = os.environ.get('WIKI_RECORD_DIR')
+
+FetchResult = namedtuple('FetchResult', ['url', 'status', 'headers', 'text'])
+
+
+class FetchEngine:
+    """Pooled asyncio HTTP client that can be driven from plain (threaded) scripts"""
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, per_host_limit=PER_HOST_LIMIT,
+                 host_limits=None, timeout=TIMEOUT, user_agent=USER_AGENT,
+                 base_url=BASE_URL, record_dir=RECORD_DIR, limiter=None, max_retries=MAX_RETRIES):
+        self.base_url = base_url
+        self.limiter = limiter if limiter is not None else get_limiter()
+        self.max_retries = max_retries
+        self.record_dir = record_dir
+        self.max_connections = max_connections
+        self.per_host_limit = per_host_limit
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._session = None
+        self._semaphores = {}
+        # The event loop lives in a background thread so callers stay synchronous
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'User-Agent': self.user_agent},
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def _semaphore(self, host):
+        if host not in self._semaphores:
+            limit = self.host_limits.get(host, self.per_host_limit)
+            self._semaphores[host] = asyncio.Semaphore(limit)
+        return self._semaphores[host]
+
+    async def fetch(self, url, params=None):
+        """Fetch one URL, returning a FetchResult or None on a network error
+
+        Every attempt goes through the shared rate limiter; 429/503/maxlag answers and
+        network errors are retried after the pause the limiter (or Retry-After) asks for.
+        """
+        session = self._get_session()
+        host = urlsplit(url).netloc
+        result = None
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self.limiter.reserve(host))
+            async with self._semaphore(host):
+                try:
+                    async with session.get(rewrite_url(url, self.base_url), params=params) as response:
+                        text = await response.text()
+                        # Header names are case-insensitive (HTTP/2 sends them in lower case)
+                        result = FetchResult(str(response.url), response.status, CIMultiDict(response.headers), text)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"An error occurred while fetching {url}: {e}")
+                    result = None
+                    self.limiter.throttle(host)
+                    continue
+            if not is_throttled(result):
+                self.limiter.success(host)
+                break
+            print(f"Throttled by {host} (status {result.status}), backing off")
+            self.limiter.throttle(host, parse_retry_after(result.headers.get('Retry-After')))
+        if result is not None and self.record_dir:
+            save_fixture(self.record_dir, url, params, result.status, result.headers, result.text)
+        return result
+
+    async def fetch_all(self, requests):
+        return await asyncio.gather(*(self.fetch(url, params) for url, params in requests))
+
+    def run(self, coro):
+        # Run a coroutine on the engine loop and wait for its result
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def get(self, url, params=None):
+        return self.run(self.fetch(url, params))
+
+    def get_text(self, url, params=None):
+        result = self.get(url, params)
+        if result is None or result.status != 200:
+            return None
+        return result.text
+
+    def get_json(self, url, params=None):
+        result = self.get(url, params)
+        return _as_json(result)
+
+    def map_text(self, urls):
+        # Fetch many pages concurrently, keeping the input order
+        results = self.run(self.fetch_all([(url, None) for url in urls]))
+        return [r.text if r is not None and r.status == 200 else None for r in results]
+
+    def map_json(self, requests):
+        # requests is a list of (url, params) pairs
+        results = self.run(self.fetch_all(requests))
+        return [_as_json(r) for r in results]
+
+    def close(self):
+        if self._session is not None:
+            self.run(self._session.close())
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def is_throttled(result):
+    # 429/503, or a MediaWiki maxlag error (served with status 200 and a Retry-After header)
+    if result.status in (429, 503):
+        return True
+    return 'Retry-After' in result.headers and '"maxlag"' in result.text[:500]
+
+
+def rewrite_url(url, base_url):
+    # https://fa.wikipedia.org/w/api.php -> <base_url>/fa.wikipedia.org/w/api.php
+    if not base_url:
+        return url
+    parts = urlsplit(url)
+    rewritten = f"{base_url.rstrip('/')}/{parts.netloc}{parts.path}"
+    return rewritten + ('?' + parts.query if parts.query else '')
+
+
+def _as_json(result):
+    if result is None or result.status != 200:
+        return None
+    try:
+        return json.loads(result.text)
+    except ValueError:
+        print(f"Invalid JSON returned by {result.url}")
+        return None
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Process-wide shared FetchEngine"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = FetchEngine()
+            atexit.register(_engine.close)
+        return _engine
@@ -1,98 +1,65 @@
 # get the script path
-import os   
-script_dir = os.path.dirname(os.path.abspath(__file__))
-
-#import the Eras csv file
-import pandas as pd
-eras = pd.read_csv(os.path.join(script_dir, 'assets/data/Eras.csv'))
-
-# get the list of eras with the start and end dates
-eras_list = []
-for index, row in eras.iterrows():
-    eras_list.append((row['Era_English'], row['Year_start'], row['Year_End']))
-
-print(eras_list)
-
+import os
 import datetime
-def generate_daily_dates_for_year(year_input):
-            # Prompt the user for a year and convert it to an integer
-    year = int(year_input)
-    # 1. Define the start and end dates
-        # Start date: January 1st of the specified year
-    start_date = datetime.date(year, 1, 1)
-    end_date = datetime.date(year + 1, 1, 1)
-    
-    current_date = start_date
-    one_day = datetime.timedelta(days=1)
-    
-    daily_dates = []
+import json
+import numpy as np
+script_dir = os.path.dirname(os.path.abspath(__file__))
 
-    # 3. Loop through all days until we hit the start of the next year
-    while current_date < end_date:    
-        # A simpler, more robust way to get YYYY/M/D format:
-        date_string = f"{current_date.year}/{current_date.month}/{current_date.day}"
-        daily_dates.append(date_string)
-        # Move to the next day
-        current_date += one_day
-    # 4. Return the list of dates (removed verbose printing)
-    return daily_dates
-'''
-for era in eras_list:
-    era_name = era[0]
-    start_year = era[1]
-    end_year = era[2]
-    all_dates = []
-    for year in range(start_year, end_year + 1):
-        daily_dates = generate_daily_dates_for_year(year)
-        all_dates.extend(daily_dates)
-    
-    # save the dates to a csv file
-    df = pd.DataFrame(all_dates, columns=['Date'])
-    df.to_csv(os.path.join(script_dir, f'assets/data/{era_name}_dates.csv'), index=False)
-'''
+# The calendar covers every day of every era. Instead of writing each of those days out, the
+# artifact holds day ranges that the calendar expands when it needs them:
+#   assets/data/calendar_ranges.json  every era as {era, era_persian, start, end, days}, plus the
+#                                     merged runs of days covered by any era as [first day, length]
+#                                     pairs, days counted from 1970-01-01 (negative before it)
+#   assets/data/calendar_days.bin     the same runs as little-endian int32 pairs
+# A range expands to its dates with np.arange(start, end + 1, dtype='datetime64[D]'), or in
+# JavaScript with new Date(day * 86400000) for every day of a run.
 
-# Generate all dates for all eras
-print("Generating calendar dates for all eras...")
-all_dates = []
-total_years = sum(era[2] - era[1] + 1 for era in eras_list)
-processed_years = 0
+#import the Eras csv file (the website copy when there is one, the Data_Processing one otherwise)
+import pandas as pd
+eras_path = os.path.join(script_dir, 'assets/data/Eras.csv')
+if not os.path.exists(eras_path):
+    eras_path = os.path.join(script_dir, '..', 'Data_Processing', 'data', 'eras.csv')
+eras = pd.read_csv(eras_path).rename(columns={'Year_Start': 'Year_start', 'Year_end': 'Year_End'})
 
-for era in eras_list:
-    era_name = era[0]
-    start_year = era[1]
-    end_year = era[2]
-    print(f"Processing era: {era_name} ({start_year}-{end_year})")
-    
-    for year in range(start_year, end_year + 1):
-        daily_dates = generate_daily_dates_for_year(year)
-        all_dates.extend(daily_dates)
-        processed_years += 1
-        
-        # Show progress every 50 years
-        if processed_years % 50 == 0:
-            progress = (processed_years / total_years) * 100
-            print(f"Progress: {processed_years}/{total_years} years ({progress:.1f}%)")
+# An era without an end year (the current one) runs until this year
+current_year = datetime.date.today().year
+open_ended = eras['Year_End'].isna()
+start_years = eras['Year_start'].astype(int).to_numpy()
+end_years = np.maximum(eras['Year_End'].fillna(current_year).astype(int).to_numpy(), start_years)
 
-print(f"\nGenerated {len(all_dates)} total dates")
+# First and last day of every era: January 1st of the start year to December 31st of the end year
+starts = (start_years - 1970).astype('datetime64[Y]').astype('datetime64[D]')
+ends = (end_years + 1 - 1970).astype('datetime64[Y]').astype('datetime64[D]') - np.timedelta64(1, 'D')
+days = (ends - starts).astype(int) + 1
 
-# Save all the dates to CSV and JSON files
-print("Saving to CSV...")
-df = pd.DataFrame(all_dates, columns=['Date'])
-df.to_csv(os.path.join(script_dir, 'assets/data/all_dates.csv'), index=False)
+ranges = [{'era': era, 'era_persian': era_persian, 'start': str(start), 'end': str(end), 'days': int(count),
+           'open_ended': bool(is_open)}
+          for era, era_persian, start, end, count, is_open
+          in zip(eras['Era_English'], eras['Era_Persian'], starts, ends, days, open_ended)]
+for era_range in ranges:
+    print(f"{era_range['era']}: {era_range['start']} to {era_range['end']} ({era_range['days']} days)")
 
-# Save as properly formatted JSON
-print("Saving to JSON...")
-import json
+# Eras overlap (Zandian falls inside Afsharian), so the runs are the union of the era ranges:
+# a new run starts wherever a range begins after the day following every earlier range
+order = np.argsort(starts, kind='stable')
+first_days = starts[order].astype(np.int64)
+last_days = ends[order].astype(np.int64)
+reach = np.maximum.accumulate(last_days)
+new_run = np.concatenate(([True], first_days[1:] > reach[:-1] + 1))
+run_starts = first_days[new_run]
+run_ends = np.maximum.reduceat(last_days, np.flatnonzero(new_run))
+runs = np.column_stack((run_starts, run_ends - run_starts + 1)).astype('<i4')
 
-# Convert DataFrame to list of dictionaries
-dates_list = df.to_dict('records')
+print(f"\n{len(ranges)} eras, {int(runs[:, 1].sum())} distinct days in {len(runs)} runs")
 
-# Save as properly formatted JSON
-with open(os.path.join(script_dir, 'assets/data/all_dates.json'), 'w') as f:
-    json.dump(dates_list, f, indent=2, ensure_ascii=False)
+# Save the ranges to JSON and the runs to the binary file
+with open(os.path.join(script_dir, 'assets/data/calendar_ranges.json'), 'w', encoding='utf-8') as f:
+    json.dump({'epoch': '1970-01-01', 'eras': ranges, 'runs': runs.tolist()}, f, ensure_ascii=False,
+              separators=(',', ':'))
+runs.tofile(os.path.join(script_dir, 'assets/data/calendar_days.bin'))
 
 print("Calendar generation complete!")
 print(f"Files saved:")
-print(f"  - CSV: {os.path.join(script_dir, 'assets/data/all_dates.csv')}")
-print(f"  - JSON: {os.path.join(script_dir, 'assets/data/all_dates.json')}")
-print(f"Total dates generated: {len(all_dates)}")
\ No newline at end of file
+for name in ('calendar_ranges.json', 'calendar_days.bin'):
+    path = os.path.join(script_dir, 'assets/data', name)
+    print(f"  - {path} ({os.path.getsize(path)} bytes)")